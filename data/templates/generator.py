@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List
 
@@ -13,6 +14,30 @@ def load_contract_templates() -> Dict[str, Any]:
     return json.loads(TEMPLATE_PATH.read_text(encoding="utf-8"))
 
 
+@lru_cache(maxsize=1)
+def _contracts_by_type() -> Dict[str, Dict[str, Any]]:
+    """
+    contract_type -> generated contract, assembled once per process
+    (first entry wins if a type is listed twice).
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    for c in load_contract_templates().get("contracts", []):
+        contract_type = c.get("contract_type")
+        if contract_type in out:
+            continue
+        out[contract_type] = {
+            "contract_type": contract_type,
+            "name": c.get("name"),
+            "description": c.get("description"),
+            "text": "\n\n".join(f"{clause['title']}\n{clause['text']}" for clause in c.get("clauses", [])),
+        }
+    return out
+
+
+def invalidate_contract_templates() -> None:
+    _contracts_by_type.cache_clear()
+
+
 def generate_contract(contract_type: str) -> Dict[str, Any]:
     """
     Returns:
@@ -23,21 +48,7 @@ def generate_contract(contract_type: str) -> Dict[str, Any]:
         "text": str
       }
     """
-    data = load_contract_templates()
-    contracts = data.get("contracts", [])
-
-    for c in contracts:
-        if c.get("contract_type") == contract_type:
-            sections = []
-            for clause in c.get("clauses", []):
-                sections.append(f"{clause['title']}\n{clause['text']}")
-            full_text = "\n\n".join(sections)
-
-            return {
-                "contract_type": contract_type,
-                "name": c.get("name"),
-                "description": c.get("description"),
-                "text": full_text,
-            }
-
-    raise ValueError(f"No SME template found for contract type: {contract_type}")
+    contract = _contracts_by_type().get(contract_type)
+    if contract is None:
+        raise ValueError(f"No SME template found for contract type: {contract_type}")
+    return dict(contract)
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
 
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
 
 TEMPLATE_PATH = Path("data/templates/sme_templates.json")
@@ -18,27 +19,74 @@ class TemplateClause:
     category: str
     name: str
     text: str
+    # De-duplicated, sorted whitespace tokens of `text`, computed once at load
+    # (token_set_ratio only depends on the token set, so scores are unchanged)
+    match_text: str = field(default="", repr=False)
+    # contract_types as a set (empty list counts as ["unknown"]), for O(1) membership
+    type_set: FrozenSet[str] = field(default=frozenset(), repr=False)
 
 
+def _match_text(text: str) -> str:
+    return " ".join(sorted(set(text.split())))
+
+
+@lru_cache(maxsize=1)
 def load_templates() -> List[TemplateClause]:
+    """
+    Parsed once per process; call invalidate_templates() after editing the JSON.
+    """
     if not TEMPLATE_PATH.exists():
         raise FileNotFoundError(f"Template library not found: {TEMPLATE_PATH}")
 
     data = json.loads(TEMPLATE_PATH.read_text(encoding="utf-8"))
     out: List[TemplateClause] = []
     for t in data.get("templates", []):
+        text = str(t.get("text", ""))
+        contract_types = list(t.get("contract_types", ["unknown"]))
         out.append(
             TemplateClause(
                 id=str(t.get("id", "")),
-                contract_types=list(t.get("contract_types", ["unknown"])),
+                contract_types=contract_types,
                 category=str(t.get("category", "unknown")),
                 name=str(t.get("name", "")),
-                text=str(t.get("text", "")),
+                text=text,
+                match_text=_match_text(text),
+                type_set=frozenset(contract_types or ["unknown"]),
             )
         )
     return out
 
 
+# (templates, their match_text) eligible for one contract type, in file order
+_Candidates = Tuple[List[TemplateClause], List[str]]
+
+
+@lru_cache(maxsize=1)
+def _templates_by_type() -> Tuple[Dict[str, _Candidates], _Candidates]:
+    """
+    Pre-partitions templates per contract type ("unknown" templates are
+    eligible everywhere). The second value is the fallback for types no
+    template names.
+    """
+    templates = load_templates()
+
+    def bucket(eligible: List[TemplateClause]) -> _Candidates:
+        return eligible, [t.match_text for t in eligible]
+
+    all_types = set().union(*(t.type_set for t in templates))
+    by_type = {
+        ct: bucket([t for t in templates if ct in t.type_set or "unknown" in t.contract_types])
+        for ct in all_types
+    }
+    generic = bucket([t for t in templates if "unknown" in t.contract_types])
+    return by_type, generic
+
+
+def invalidate_templates() -> None:
+    load_templates.cache_clear()
+    _templates_by_type.cache_clear()
+
+
 def match_clause_to_templates(
     clause_text: str,
     contract_type: str = "unknown",
@@ -48,20 +96,23 @@ def match_clause_to_templates(
     Returns top_k matches by similarity.
     Uses fuzzy token_set_ratio (good for legal text).
     """
-    clause_text = clause_text or ""
-    templates = load_templates()
-
-    scored = []
-    for t in templates:
-        # Contract type filter: allow "unknown" templates + matching types
-        if contract_type not in (t.contract_types or ["unknown"]) and "unknown" not in (t.contract_types or []):
-            continue
+    query = clause_text or ""
 
-        score = fuzz.token_set_ratio(clause_text, t.text)  # 0-100
-        scored.append((score, t))
+    # Contract type filter: allow "unknown" templates + matching types
+    by_type, generic = _templates_by_type()
+    candidates, candidate_texts = by_type.get(contract_type, generic)
 
-    scored.sort(key=lambda x: x[0], reverse=True)
-    scored = scored[:top_k]
+    # Scoring + top-k selection run inside rapidfuzz (C++), not a Python loop/sort.
+    # Like the direct token_set_ratio calls it replaces: no case folding or
+    # punctuation stripping on either side (processor=None).
+    matches = process.extract(
+        query,
+        candidate_texts,
+        scorer=fuzz.token_set_ratio,
+        processor=None,
+        limit=top_k,
+    )
+    scored = [(score, candidates[idx]) for _, score, idx in matches]
 
     results = []
     for score, t in scored:
@@ -70,7 +121,7 @@ def match_clause_to_templates(
                 "template_id": t.id,
                 "template_name": t.name,
                 "category": t.category,
-                "allowed_contract_types": t.contract_types,
+                "allowed_contract_types": list(t.contract_types),
                 "similarity_score": int(score),
                 "template_text": t.text,
             }
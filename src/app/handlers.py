@@ -0,0 +1,592 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import gradio as gr
+
+from src.cache import LRUCache, file_key
+from src.audit.logger import append_audit_event
+from src.ingestion.loader import load_text_from_upload
+from src.nlp.preprocess import preprocess_contract
+
+from src.nlp.ambiguity import format_ambiguity_as_text
+from src.nlp.deontic import format_deontic_as_text
+from src.summary.executive import generate_executive_summary
+
+from src.llm.ollama_client import analyze_clause_stream, analyze_clause_with_llm, iter_clause_analyses
+from src.risk.scoring import normalize_risk
+from src.risk.aggregator import ClauseAnalysis, aggregate_contract
+from src.risk.selector import smart_select_clauses
+
+from src.compliance.checks import run_compliance_checks_by_clauses, format_compliance_flags
+from src.negotiation.rewrite import rewrite_clause
+from src.export.pdf_report import generate_pdf_report
+
+# ✅ IMPORTANT: matcher & generator are in data/
+from data.templates.matcher import match_clause_to_templates
+from data.templates.generator import generate_contract
+
+# ✅ NEW: knowledge base
+from src.kb.knowledge_base import append_contract_insight, get_kb_dashboard
+
+
+# Whitespace that would break a one-line dropdown label
+_NL_TO_SPACE = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
+
+
+# (upload SHA1, extension) -> (LoadedDocument, PreprocessResult, clause_choices, clauses_list);
+# re-uploads skip text extraction, the spaCy / translation / regex passes and
+# rebuilding the dropdown. Cached lists are shared, so handlers must not mutate them.
+_PREPROCESS_CACHE = LRUCache(maxsize=16)
+
+
+def _clause_views(clauses):
+    # Single pass over clauses builds the dropdown choices and the state list;
+    # the dropdown value is the clause index into clauses_list
+    clause_choices, clauses_list = [], []
+    for i, c in enumerate(clauses):
+        clause_choices.append((f"{c.clause_id} — {c.text[:80].translate(_NL_TO_SPACE)}...", i))
+        clauses_list.append({"clause_id": c.clause_id, "text": c.text})
+    return clause_choices, clauses_list
+
+
+def _document_key(filename: str, file_path: str) -> str:
+    # Identifies the uploaded document itself (not just its clauses)
+    return f"{file_key(file_path)}{os.path.splitext(filename)[1].lower()}"
+
+
+def _load_and_preprocess_cached(key: str, filename: str, file_path: str):
+    cached = _PREPROCESS_CACHE.get(key)
+    if cached is None:
+        loaded = load_text_from_upload(filename, file_path)
+        prep = preprocess_contract(loaded.text)
+        cached = (loaded, prep) + _clause_views(prep.clauses)
+        _PREPROCESS_CACHE.put(key, cached)
+    return cached
+
+
+# contract key -> (compliance flags, formatted text); repeat "Analyze" clicks skip the regex pass
+_COMPLIANCE_CACHE = LRUCache(maxsize=8)
+
+# contract key -> (selected clauses, stats)
+_SELECTION_CACHE = LRUCache(maxsize=8)
+
+
+def _clauses_key(clauses_list) -> str:
+    # Hashed clause by clause, so the contract is never joined into one string
+    h = hashlib.sha1()
+    for c in clauses_list:
+        h.update(f"{c.get('clause_id', '')}\x1e".encode("utf-8"))
+        h.update((c.get("text", "") or "").encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def _compliance_cached(contract_key: str, clauses_list):
+    hit = _COMPLIANCE_CACHE.get(contract_key)
+    if hit is None:
+        flags = run_compliance_checks_by_clauses(c.get("text", "") for c in clauses_list)
+        hit = (flags, format_compliance_flags(flags))
+        _COMPLIANCE_CACHE.put(contract_key, hit)
+    return hit
+
+
+def _select_clauses_cached(contract_key: str, clauses_list, max_llm_clauses: int = 12, ensure_baseline: int = 2):
+    key = (contract_key, max_llm_clauses, ensure_baseline)
+    hit = _SELECTION_CACHE.get(key)
+    if hit is None:
+        hit = smart_select_clauses(clauses_list, max_llm_clauses=max_llm_clauses, ensure_baseline=ensure_baseline)
+        _SELECTION_CACHE.put(key, hit)
+    return hit
+
+
+def process_upload(file_path, prev_doc_key=None):
+    """
+    prev_doc_key is the document key state of the last processed upload;
+    when the same document is processed again, the heavy outputs are sent
+    as no-op gr.update()s.
+
+    Returns:
+      status,
+      contract_type_line,
+      entities_dict,
+      ambiguity_text,
+      deontic_text,
+      original_preview,
+      normalized_preview,
+      detected_language,
+      dropdown_update,      (choices are (label, index) pairs)
+      first_clause_text,
+      clauses_list,
+      doc_key
+    """
+    if file_path is None:
+        # Nothing was loaded: keep whatever the UI currently shows
+        return ("No file uploaded.",) + tuple(gr.update() for _ in range(11))
+
+    file_path_str = str(file_path)
+    filename = os.path.basename(file_path_str)
+
+    try:
+        # Parsers read from the path directly; the cache key is hashed in chunks
+        doc_key = _document_key(filename, file_path_str)
+        loaded, prep, clause_choices, clauses_list = _load_and_preprocess_cached(doc_key, filename, file_path_str)
+
+        status = (
+            f"✅ Loaded: {loaded.doc_type.upper()} | "
+            f"Language: {prep.language.upper()} → {prep.normalized_language.upper()} | "
+            f"Normalized: {prep.did_normalize} | "
+            f"Chars: {len(loaded.text)} | Clauses: {len(prep.clauses)}"
+        )
+
+        contract_type_line = (
+            f"{prep.contract_type} | conf={prep.contract_type_confidence} | method={prep.contract_type_method} "
+            f"| evidence={', '.join(prep.contract_type_evidence) if prep.contract_type_evidence else '[]'}"
+        )
+
+        amb = getattr(prep, "ambiguity", None) or {}
+        deontic = getattr(prep, "deontic", None) or {}
+
+        ambiguity_text = format_ambiguity_as_text(amb)
+        deontic_text = format_deontic_as_text(deontic)
+
+        original_preview = loaded.text[:8000]
+        normalized_preview = prep.normalized_text[:8000]
+
+        dropdown_update = gr.update(
+            choices=clause_choices,
+            value=0 if clause_choices else None,
+        )
+
+        first_clause_text = clauses_list[0]["text"] if clauses_list else ""
+
+        ents = prep.entities or {}
+        parties = ents.get("parties") or {}
+        ent_counts = {
+            "organizations": len(ents.get("organizations", [])),
+            "persons": len(ents.get("persons", [])),
+            "locations": len(ents.get("locations", [])),
+            "dates": len(ents.get("dates", [])),
+            "money_amounts": len(ents.get("money_amounts", [])),
+            "jurisdiction_mentions": len(ents.get("jurisdiction_mentions", [])),
+            "party_mentions": len(parties.get("party_mentions") or []),
+            "party_roles": len(parties.get("roles") or {}),
+        }
+
+        amb_metrics = {
+            "level": amb.get("level", "None"),
+            "score": amb.get("score", 0),
+            "hits": len(amb.get("hits") or []),
+        }
+
+        # ✅ deontic counts for audit
+        deontic_counts = deontic.get("counts", {})
+
+        append_audit_event(
+            {
+                "event": "upload_and_extract",
+                "filename": filename,
+                "doc_type": loaded.doc_type,
+                "language_detected": prep.language,
+                "language_normalized": prep.normalized_language,
+                "did_normalize": prep.did_normalize,
+                "chars_extracted": len(loaded.text),
+                "chars_normalized": len(prep.normalized_text),
+                "clauses_extracted": len(prep.clauses),
+                "contract_type": prep.contract_type,
+                "contract_type_confidence": prep.contract_type_confidence,
+                "contract_type_method": prep.contract_type_method,
+                "contract_type_evidence": prep.contract_type_evidence,
+                "entity_counts": ent_counts,
+                "ambiguity": amb_metrics,
+                "deontic_counts": deontic_counts,
+            }
+        )
+
+        if prev_doc_key == doc_key:
+            # Same document re-processed: only the status line needs to go over the wire
+            return (status,) + tuple(gr.update() for _ in range(11))
+
+        return (
+            status,
+            contract_type_line,
+            prep.entities,
+            ambiguity_text,
+            deontic_text,
+            original_preview,
+            normalized_preview,
+            prep.language,
+            dropdown_update,
+            first_clause_text,
+            clauses_list,
+            doc_key,
+        )
+
+    except Exception as e:
+        return (
+            f"❌ Error: {e}",
+            "",
+            {},
+            "",
+            "",
+            "",
+            "",
+            "",
+            gr.update(choices=[], value=None),
+            "",
+            [],
+            None,
+        )
+
+
+def _clause_text_at(selected_idx, clauses_list) -> str:
+    """
+    Dropdown values are indexes into clauses_list ("" if nothing valid is selected).
+    """
+    if selected_idx is None or not clauses_list:
+        return ""
+    try:
+        return clauses_list[int(selected_idx)].get("text", "")
+    except (IndexError, TypeError, ValueError):
+        return ""
+
+
+def show_selected_clause(selected_idx, clauses_list):
+    return _clause_text_at(selected_idx, clauses_list)
+
+
+def _finish_clause_analysis(clause_text, llm_raw):
+    result = normalize_risk(llm_raw)
+
+    append_audit_event(
+        {
+            "event": "llm_clause_analysis",
+            "clause_type": result["clause_type"],
+            "risk_level": result["risk_level"],
+            "chars_clause": len(clause_text),
+        }
+    )
+
+    return (
+        result["clause_type"],
+        result["explanation"],
+        f"{result['risk_level']} — {result['risk_reason']}",
+        result["mitigation"],
+    )
+
+
+def _analyze_clause_once(selected_idx, clauses_list):
+    clause_text = _clause_text_at(selected_idx, clauses_list)
+    if not clause_text:
+        return "", "", "", ""
+    return _finish_clause_analysis(clause_text, analyze_clause_with_llm(clause_text))
+
+
+def analyze_selected_clause(selected_idx, clauses_list):
+    """
+    Generator: fills in clause type / explanation / risk / mitigation as the
+    model's JSON fields arrive, then yields the normalized final values.
+    """
+    clause_text = _clause_text_at(selected_idx, clauses_list)
+    if not clause_text:
+        yield "", "", "", ""
+        return
+
+    partial = {}
+    stream = analyze_clause_stream(clause_text)
+    while True:
+        try:
+            key, value = next(stream)
+        except StopIteration as stop:
+            llm_raw = stop.value
+            break
+        partial[key] = value
+        risk_level = partial.get("risk_level")
+        yield (
+            str(partial.get("clause_type", "")),
+            str(partial.get("explanation", "")),
+            f"{risk_level} — {partial.get('risk_reason', '')}" if risk_level else "",
+            str(partial.get("mitigation_suggestion", "")),
+        )
+
+    yield _finish_clause_analysis(clause_text, llm_raw)
+
+
+def _format_contract_summary(summary):
+    """
+    Returns (counts_line, high_risk_text, red_flags_text) for the UI.
+    """
+    counts = summary["counts"]
+    counts_line = (
+        f"High: {counts.get('High', 0)} | "
+        f"Medium: {counts.get('Medium', 0)} | "
+        f"Low: {counts.get('Low', 0)} | "
+        f"Unclear: {counts.get('Unclear', 0)}"
+    )
+
+    high_risk_text = "\n\n".join(
+        f"- {x['clause_id']} ({x['clause_type']}): {x['risk_reason']}\n  {x['text_preview']}"
+        for x in summary["top_high_risk"]
+    ) or "No High-risk clauses detected in analyzed subset."
+
+    red_flags_text = "\n".join(
+        f"- [{x['severity']}] {x['flag_type']}: {x['reason']}" for x in summary["red_flags"]
+    ) or "No rule-based red flags detected."
+
+    return counts_line, high_risk_text, red_flags_text
+
+
+def analyze_full_contract(clauses_list, entities_dict, contract_type_line, ambiguity_text):
+    """
+    Generator handler: yields a partial summary each time a clause analysis
+    completes, then the final summary (with executive summary + KB write).
+    """
+
+    if not clauses_list:
+        yield (
+            "Unclear",
+            "0.0",
+            "High: 0 | Medium: 0 | Low: 0 | Unclear: 0",
+            "No clauses found.",
+            "[]",
+            "No compliance-related heuristic flags detected.",
+            "No executive summary available.",
+            {},
+        )
+        return
+
+    contract_key = _clauses_key(clauses_list)
+    compliance_flags, compliance_text = _compliance_cached(contract_key, clauses_list)
+
+    selected, sel_stats = _select_clauses_cached(
+        contract_key,
+        clauses_list,
+        max_llm_clauses=12,
+        ensure_baseline=2,
+    )
+
+    # Identical clause texts (boilerplate) get one LLM call; the result is shared by every copy
+    groups = {}
+    for i, c in enumerate(selected):
+        groups.setdefault(c.text, []).append(i)
+    unique_texts = list(groups)
+    members = list(groups.values())
+
+    # Results are slotted by selection index so the final output order is deterministic
+    results = [None] * len(selected)
+    completed = 0
+
+    for group_idx, llm_raw in iter_clause_analyses(unique_texts):
+        result = normalize_risk(llm_raw)
+        for idx in members[group_idx]:
+            c = selected[idx]
+            results[idx] = ClauseAnalysis(
+                clause_id=c.clause_id,
+                clause_text=c.text,
+                clause_type=result["clause_type"],
+                risk_level=result["risk_level"],
+                risk_reason=result["risk_reason"],
+            )
+            completed += 1
+
+        if completed < len(selected):
+            partial = aggregate_contract([r for r in results if r is not None])
+            counts_line, high_risk_text, red_flags_text = _format_contract_summary(partial)
+            yield (
+                partial["overall_risk"],
+                str(partial["avg_score"]),
+                counts_line,
+                high_risk_text,
+                red_flags_text,
+                compliance_text,
+                f"Analyzing clauses... {completed}/{len(selected)} done.",
+                gr.update(),
+            )
+
+    clause_results = [r for r in results if r is not None]
+    selection_debug = [
+        {"clause_id": c.clause_id, "selection_score": c.score, "selection_reasons": c.reasons}
+        for c in selected
+    ]
+
+    summary = aggregate_contract(clause_results)
+    counts_line, high_risk_text, red_flags_text = _format_contract_summary(summary)
+
+    executive_summary_text = generate_executive_summary(
+        contract_type_line=contract_type_line,
+        entities=entities_dict or {},
+        ambiguity_text=ambiguity_text or "",
+        overall_risk=summary["overall_risk"],
+        avg_score=str(summary["avg_score"]),
+        top_high_risk_text=high_risk_text,
+        red_flags_text=red_flags_text,
+        compliance_text=compliance_text,
+    )
+
+    # ✅ NEW: store derived insights in knowledge base (NO raw contract text)
+    kb_record = append_contract_insight(
+        contract_type_line=contract_type_line,
+        overall_risk=summary["overall_risk"],
+        avg_score=str(summary["avg_score"]),
+        ambiguity_text=ambiguity_text or "",
+        red_flags_text=red_flags_text,
+        compliance_text=compliance_text,
+        top_high_risk_text=high_risk_text,
+    )
+
+    append_audit_event(
+        {
+            "event": "llm_contract_analysis_smart_select",
+            "selection_stats": sel_stats,
+            "selected_clause_debug": selection_debug[:20],
+            "overall_risk": summary["overall_risk"],
+            "avg_score": summary["avg_score"],
+            "counts": summary["counts"],
+            "red_flags_count": len(summary["red_flags"]),
+            "compliance_flags_count": len(compliance_flags),
+            "kb_record_written": True,
+            "kb_ts": kb_record.get("ts"),
+        }
+    )
+
+    yield (
+        summary["overall_risk"],
+        str(summary["avg_score"]),
+        counts_line,
+        high_risk_text,
+        red_flags_text,
+        compliance_text,
+        executive_summary_text,
+        summary,
+    )
+
+
+def export_pdf(contract_summary, high_risk_text, red_flags_text, compliance_text):
+    if not contract_summary:
+        return None
+
+    disclaimer = (
+        "This report is generated automatically for informational purposes only and does not constitute legal advice. "
+        "For decisions that may have legal or financial impact, consult a qualified legal professional."
+    )
+
+    combined_redflags = red_flags_text + "\n\nCompliance Heuristic Flags:\n" + (compliance_text or "")
+
+    out_path = generate_pdf_report(
+        filename_base="contract",
+        contract_summary=contract_summary,
+        high_risk_text=high_risk_text,
+        red_flags_text=combined_redflags,
+        disclaimer=disclaimer,
+    )
+
+    append_audit_event(
+        {"event": "export_pdf_report", "output_path": out_path, "overall_risk": contract_summary.get("overall_risk", "Unclear")}
+    )
+    return out_path
+
+
+def suggest_rewrite(selected_idx, clauses_list):
+    clause_text = _clause_text_at(selected_idx, clauses_list)
+    if not clause_text:
+        return "", "", ""
+
+    out = rewrite_clause(clause_text, party_perspective="SME")
+
+    append_audit_event(
+        {"event": "rewrite_suggestion", "is_unfavorable": out.get("is_unfavorable", False), "chars_clause": len(clause_text)}
+    )
+
+    points = "\n".join(f"- {p}" for p in out.get("negotiation_points", []))
+    combined = out.get("suggested_rewrite", "")
+    if points:
+        combined = combined + "\n\nNegotiation Points:\n" + points
+
+    return str(out.get("is_unfavorable", False)), out.get("why_unfavorable", ""), combined
+
+
+def match_selected_clause_to_templates(selected_idx, clauses_list, contract_type_line):
+    clause_text = _clause_text_at(selected_idx, clauses_list)
+    if not clause_text:
+        return []
+
+    contract_type = (contract_type_line.split("|")[0].strip() if contract_type_line else "unknown")
+
+    matches = match_clause_to_templates(clause_text, contract_type=contract_type, top_k=3)
+
+    append_audit_event(
+        {"event": "template_similarity_match", "contract_type": contract_type, "matches_returned": len(matches)}
+    )
+    return matches
+
+
+def analyze_clause_all(selected_idx, clauses_list, contract_type_line):
+    """
+    Runs clause analysis, rewrite suggestion and template matching for the
+    selected clause in parallel. Returns the union of their outputs:
+      clause_type, explanation, risk, mitigation,
+      is_unfavorable, why_unfavorable, rewrite_text,
+      template_matches
+    """
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        f_analysis = ex.submit(_analyze_clause_once, selected_idx, clauses_list)
+        f_rewrite = ex.submit(suggest_rewrite, selected_idx, clauses_list)
+        f_templates = ex.submit(match_selected_clause_to_templates, selected_idx, clauses_list, contract_type_line)
+
+        return (*f_analysis.result(), *f_rewrite.result(), f_templates.result())
+
+
+def generate_sme_contract(contract_type):
+    if not contract_type:
+        return "Please select a contract type."
+
+    try:
+        out = generate_contract(contract_type)
+
+        append_audit_event(
+            {"event": "generate_sme_contract", "contract_type": contract_type, "template_name": out.get("name")}
+        )
+
+        header = f"{out.get('name','SME Contract Template')}\n\n{out.get('description','')}\n\n"
+        return header + out.get("text", "")
+
+    except Exception as e:
+        return f"❌ Error: {e}"
+
+
+# ✅ NEW: KB refresh handler
+def refresh_knowledge_base(n: int = 200):
+    try:
+        return get_kb_dashboard(n=n)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+_WARMUP_TEXT = "1. Payment. The Client shall pay the Vendor within 30 days of invoice."
+
+
+def _warmup() -> None:
+    # Each step is independent: a missing Ollama server shouldn't stop the spaCy load
+    for step in (
+        lambda: preprocess_contract(_WARMUP_TEXT),
+        # Bypass the result cache: the point is to make Ollama load the model
+        lambda: analyze_clause_with_llm(_WARMUP_TEXT, use_cache=False),
+    ):
+        try:
+            step()
+        except Exception:
+            traceback.print_exc()
+
+
+def start_warmup() -> threading.Thread:
+    """
+    Loads spaCy / langdetect profiles and the Ollama model in the background
+    so the first real upload doesn't pay the cold-start cost.
+    """
+    t = threading.Thread(target=_warmup, name="model-warmup", daemon=True)
+    t.start()
+    return t
@@ -1,22 +1,115 @@
-import json
+import atexit
 import os
+import queue
+import sys
+import threading
+import time
+import traceback
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, BinaryIO, Dict, List, Optional
 
-from src.config import AUDIT_LOG_PATH 
+import orjson
+
+from src.config import AUDIT_LOG_PATH
+
+
+# Events are written by one background thread in batches, so handlers never
+# wait on file I/O. A batch is flushed after _FLUSH_INTERVAL_S or _BATCH_MAX events.
+_BATCH_MAX = 64
+_FLUSH_INTERVAL_S = 0.1
+
+# numpy scalars (e.g. aggregated scores) serialize natively
+_DUMPS_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+
+_QUEUE: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+_WRITER: Optional[threading.Thread] = None
+_WRITER_LOCK = threading.Lock()
+
+
+def _open_log() -> BinaryIO:
+    os.makedirs(os.path.dirname(AUDIT_LOG_PATH), exist_ok=True)
+    return open(AUDIT_LOG_PATH, "ab", buffering=1 << 16)
+
+
+def _write_batch(f: BinaryIO, batch: List[Dict[str, Any]]) -> None:
+    lines = []
+    for e in batch:
+        try:
+            lines.append(orjson.dumps(e, option=_DUMPS_OPTIONS))
+        except orjson.JSONEncodeError:
+            # Only this event is lost; the rest of the batch is still written
+            print(f"audit log: dropped unserializable event {e.get('event')!r}", file=sys.stderr)
+            traceback.print_exc()
+    if lines:
+        f.write(b"".join(lines))
+        f.flush()
+
+
+def _drain() -> None:
+    # The writer thread owns one long-lived append handle: one write + flush
+    # per batch, no open/close per event.
+    f: Optional[BinaryIO] = None
+    while True:
+        batch = [_QUEUE.get()]
+        deadline = time.monotonic() + _FLUSH_INTERVAL_S
+        while len(batch) < _BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        try:
+            if f is None:
+                f = _open_log()
+            _write_batch(f, batch)
+        except Exception:
+            # Never kill the writer thread; report, reopen next time, keep draining
+            traceback.print_exc()
+            if f is not None:
+                try:
+                    f.close()
+                except Exception:
+                    pass
+                f = None
+        finally:
+            for _ in batch:
+                _QUEUE.task_done()
+
+
+def _ensure_writer() -> None:
+    global _WRITER
+    if _WRITER is not None:
+        return
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            _WRITER = threading.Thread(target=_drain, name="audit-log-writer", daemon=True)
+            _WRITER.start()
+
+
+def flush_audit_log() -> None:
+    """
+    Blocks until every queued audit event has been written.
+    """
+    if _WRITER is not None:
+        _QUEUE.join()
+
+
+atexit.register(flush_audit_log)
 
 
 def append_audit_event(event: Dict[str, Any]) -> None:
     """
     Append-only JSONL audit log for confidentiality + traceability.
     Each line is one JSON object.
+    The event is timestamped now and written asynchronously.
     """
-    os.makedirs(os.path.dirname(AUDIT_LOG_PATH), exist_ok=True)
-
     event_out = {
         "ts_utc": datetime.now(timezone.utc).isoformat(),
         **event,
     }
 
-    with open(AUDIT_LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps(event_out, ensure_ascii=False) + "\n")
+    _ensure_writer()
+    _QUEUE.put_nowait(event_out)
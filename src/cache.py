@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Hashable, Optional
+
+import diskcache
+
+from src.config import EXPORT_DIR
+
+
+def text_key(text: str) -> str:
+    """
+    Stable cache key for a piece of text (SHA1 hex digest).
+    """
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+_WS_RE = re.compile(r"\s+")
+
+
+def clause_key(text: str) -> str:
+    """
+    Digest of a clause with case and whitespace normalized, so boilerplate that
+    only differs in line wrapping or capitalization shares one cache entry.
+    """
+    norm = _WS_RE.sub(" ", (text or "").strip().lower())
+    return hashlib.blake2b(norm.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def bytes_key(content: bytes) -> str:
+    return hashlib.sha1(content or b"").hexdigest()
+
+
+def file_key(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    SHA1 of a file's bytes, read in chunks (never holds the whole file).
+    """
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU map keyed by content hashes.
+    Used instead of functools.lru_cache where the key (a hash) differs
+    from the arguments needed to compute the value (the full text).
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+@lru_cache(maxsize=1)
+def _disk_store() -> diskcache.Cache:
+    return diskcache.Cache(os.path.join(EXPORT_DIR, "llm_cache"))
+
+
+class PersistentCache:
+    """
+    LRUCache in front of an on-disk store (EXPORT_DIR/llm_cache) so LLM
+    results survive restarts. Keys are namespaced; values are copied in and
+    out, so callers can't mutate a cached entry.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 256):
+        self.namespace = namespace
+        self._memory = LRUCache(maxsize=maxsize)
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        value = self._memory.get(key)
+        if value is None:
+            value = _disk_store().get(f"{self.namespace}:{key}")
+            if value is None:
+                return default
+            self._memory.put(key, value)
+        return copy.deepcopy(value)
+
+    def put(self, key: str, value: Any) -> None:
+        value = copy.deepcopy(value)
+        self._memory.put(key, value)
+        _disk_store().set(f"{self.namespace}:{key}", value)
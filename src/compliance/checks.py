@@ -1,8 +1,15 @@
 from __future__ import annotations
 
 import re
+import threading
 from dataclasses import dataclass
-from typing import List, Tuple
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+try:
+    import hyperscan
+except ImportError:  # optional: wheels are x86-64 only
+    hyperscan = None
 
 
 @dataclass
@@ -98,22 +105,113 @@ CHECKS: List[Tuple[str, str, re.Pattern, str, List[str]]] = [
 ]
 
 
-def run_compliance_checks(full_text: str) -> List[ComplianceFlag]:
-    text = full_text or ""
+def _flags_for(indices: Iterable[int]) -> List[ComplianceFlag]:
     flags: List[ComplianceFlag] = []
-    for topic, severity, pattern, why, checklist in CHECKS:
-        if pattern.search(text):
-            flags.append(
-                ComplianceFlag(
-                    topic=topic,
-                    severity=severity,
-                    why_flagged=why,
-                    what_to_check=checklist,
-                )
+    for i in sorted(indices):
+        topic, severity, _, why, checklist = CHECKS[i]
+        flags.append(
+            ComplianceFlag(
+                topic=topic,
+                severity=severity,
+                why_flagged=why,
+                what_to_check=checklist,
             )
+        )
     return flags
 
 
+def _compile_prefilter() -> Optional["hyperscan.Database"]:
+    if hyperscan is None:
+        return None
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[pattern.pattern.encode("utf-8") for _, _, pattern, _, _ in CHECKS],
+        ids=list(range(len(CHECKS))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(CHECKS),
+    )
+    return db
+
+
+# All checks compiled into one Hyperscan database: a single pass over the text
+# instead of one backtracking re.search per check.
+_HS_DB = _compile_prefilter()
+_HS_LOCAL = threading.local()  # scratch space can't be shared between threads
+
+
+# Every check starts with a \b(word|word...)\b group. Fusing just those lead
+# groups gives one cheap pass that finds each position where some check could
+# start; only there are the full patterns tried (anchored), so the result is
+# the same as searching with each pattern separately.
+_LEAD_GROUP = re.compile(r"\\b(\([^()]*\))\\b")
+
+
+def _compile_fused_leads() -> Optional[re.Pattern]:
+    leads = [_LEAD_GROUP.match(pattern.pattern) for _, _, pattern, _, _ in CHECKS]
+    if not all(leads):
+        return None
+    return re.compile(r"\b(?=" + "|".join(m.group(1) + r"\b" for m in leads) + ")", re.I)
+
+
+_FUSED_LEADS = _compile_fused_leads()
+
+
+def _matched_checks_re(text: str) -> FrozenSet[int]:
+    if _FUSED_LEADS is None:
+        return frozenset(i for i, (_, _, pattern, _, _) in enumerate(CHECKS) if pattern.search(text))
+
+    found = set()
+    for m in _FUSED_LEADS.finditer(text):
+        for i, (_, _, pattern, _, _) in enumerate(CHECKS):
+            if i not in found and pattern.match(text, m.start()):
+                found.add(i)
+        if len(found) == len(CHECKS):
+            break
+    return frozenset(found)
+
+
+def _matched_checks(text: str) -> FrozenSet[int]:
+    # Hyperscan's \b and caseless matching are ASCII-only: on other text it
+    # can both over- and under-report (e.g. "İP" vs \bIP\b under re.I), so
+    # only ASCII text goes through it.
+    if _HS_DB is None or not text.isascii():
+        return _matched_checks_re(text)
+
+    scratch = getattr(_HS_LOCAL, "scratch", None)
+    if scratch is None:
+        scratch = _HS_LOCAL.scratch = hyperscan.Scratch(_HS_DB)
+
+    hits = set()
+
+    def on_match(check_id, start, end, flags, context):
+        hits.add(check_id)
+
+    _HS_DB.scan(text.encode("ascii"), match_event_handler=on_match, scratch=scratch)
+    return frozenset(hits)
+
+
+def run_compliance_checks(full_text: str) -> List[ComplianceFlag]:
+    return _flags_for(_matched_checks(full_text or ""))
+
+
+@lru_cache(maxsize=2048)
+def _check_one_clause(text: str) -> FrozenSet[int]:
+    return _matched_checks(text)
+
+
+def run_compliance_checks_by_clauses(clause_texts: Iterable[str]) -> List[ComplianceFlag]:
+    """
+    Same result as run_compliance_checks("\n".join(clause_texts)) without
+    building the joined copy: no check pattern can match across a newline,
+    so each clause is scanned on its own (and cached per clause text).
+    """
+    found = set()
+    for text in clause_texts:
+        found |= _check_one_clause(text or "")
+        if len(found) == len(CHECKS):
+            break
+    return _flags_for(found)
+
+
 def format_compliance_flags(flags: List[ComplianceFlag]) -> str:
     if not flags:
         return "No compliance-related heuristic flags detected."
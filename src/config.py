@@ -6,8 +6,42 @@ load_dotenv()
 
 # Ollama local LLM config (Phase 2+ will use this)
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434").strip()
+# Decode speed is bound by memory bandwidth, so quantization matters more than
+# anything else here. The bare "phi3" tag already pulls a 4-bit (Q4_0) build,
+# which suits CPU hosts. On GPU hosts an explicit Q4_K_M tag (e.g.
+# "phi3:3.8b-mini-4k-instruct-q4_K_M") is slightly more accurate at about the
+# same speed. Avoid fp16 / q8_0 tags unless accuracy problems show up.
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "phi3").strip()
 
+# How long Ollama keeps the model loaded after a request (sent with every call)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m").strip()
+
+# Context window requested for every call. Keep it constant: a request with a
+# different num_ctx makes Ollama reload the model.
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096").strip() or 4096)
+
+# Max concurrent clause requests sent to Ollama during full-contract analysis.
+# Ollama only runs them in parallel if the *server* is started with
+# OLLAMA_NUM_PARALLEL >= this value (and OLLAMA_MAX_LOADED_MODELS=1 so the
+# parallel slots share one resident model); otherwise requests just queue.
+# Defaults to OLLAMA_NUM_PARALLEL when that is set in the same environment.
+LLM_MAX_WORKERS = int(
+    (os.getenv("LLM_MAX_WORKERS") or os.getenv("OLLAMA_NUM_PARALLEL") or "6").strip() or 6
+)
+
+# Clauses packed into one Ollama prompt during full-contract analysis (1 = no batching)
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "4").strip() or 4)
+
+# Longest clause text (after whitespace collapsing) embedded in an analysis
+# prompt; prompt length drives time-to-first-token. Rewrite prompts always get
+# the whole clause, since a rewrite of a cut clause would silently drop text.
+LLM_MAX_CLAUSE_CHARS = int(os.getenv("LLM_MAX_CLAUSE_CHARS", "4000").strip() or 4000)
+
+# Gradio request queue: handlers allowed to run at once, and how many
+# requests may wait before new ones are rejected
+UI_CONCURRENCY_LIMIT = int(os.getenv("UI_CONCURRENCY_LIMIT", "4").strip() or 4)
+UI_QUEUE_MAX_SIZE = int(os.getenv("UI_QUEUE_MAX_SIZE", "32").strip() or 32)
+
 # Audit + exports
 AUDIT_LOG_PATH = os.getenv("AUDIT_LOG_PATH", "logs/audit.jsonl").strip()
 EXPORT_DIR = os.getenv("EXPORT_DIR", "exports").strip()
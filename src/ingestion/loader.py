@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import os
+import threading
 from dataclasses import dataclass
 from io import BytesIO
-from typing import Optional, Tuple
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
 
+import pypdfium2 as pdfium
 from docx import Document
 from pypdf import PdfReader
 
@@ -15,27 +19,73 @@ class LoadedDocument:
     text: str
 
 
-def _load_pdf_text(content: bytes) -> str:
-    reader = PdfReader(BytesIO(content))
+# Raw bytes, or a filesystem path the parsers can open themselves
+Source = Union[bytes, str, os.PathLike]
+
+
+def _as_stream(source: Source):
+    return BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+
+# PDFium is not thread-safe; concurrent uploads must take turns
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _iter_pdf_pages_pdfium(source: Source) -> Iterator[str]:
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(bytes(source) if isinstance(source, (bytes, bytearray)) else os.fspath(source))
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                try:
+                    # Line endings fixed per page, not with a second pass over the joined text
+                    yield textpage.get_text_range().replace("\r\n", "\n")
+                finally:
+                    # Release per page so large PDFs don't hold every text page at once
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+
+
+def _load_pdf_text_pdfium(source: Source) -> str:
+    return "\n".join(_iter_pdf_pages_pdfium(source)).strip()
+
+
+def _load_pdf_text_pypdf(source: Source) -> str:
+    # Serial on purpose: pypdf is pure Python (holds the GIL), so threads
+    # don't help and separate readers would re-parse the file per range
+    reader = PdfReader(_as_stream(source))
     pages_text = []
     for page in reader.pages:
         pages_text.append(page.extract_text() or "")
     return "\n".join(pages_text).strip()
 
 
-def _load_docx_text(content: bytes) -> str:
-    doc = Document(BytesIO(content))
+def _load_pdf_text(source: Source) -> str:
+    # PDFium (C++) first; pypdf as a fallback for files it can't open
+    try:
+        return _load_pdf_text_pdfium(source)
+    except Exception:
+        return _load_pdf_text_pypdf(source)
+
+
+def _load_docx_text(source: Source) -> str:
+    doc = Document(_as_stream(source))
     paras = [p.text for p in doc.paragraphs if p.text is not None]
     return "\n".join(paras).strip()
 
 
-def _load_txt_text(content: bytes) -> str:
+def _load_txt_text(source: Source) -> str:
+    content = source if isinstance(source, (bytes, bytearray)) else Path(source).read_bytes()
     return content.decode("utf-8", errors="replace").strip()
 
 
-def load_text_from_upload(filename: str, content: bytes) -> LoadedDocument:
+def load_text_from_upload(filename: str, content: Source) -> LoadedDocument:
     """
     Extracts text from PDF (text-based), DOCX, or TXT.
+    `content` may be the uploaded bytes or a path to the file; with a path,
+    PDF/DOCX parsers read the file directly instead of a second in-memory copy.
     Raises ValueError for unsupported types or empty extraction.
     """
     lower = filename.lower().strip()
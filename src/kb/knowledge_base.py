@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-import json
 import os
+import re
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
+
+import orjson
 
 
 KB_PATH = Path("data/knowledge_base/contract_insights.jsonl")
@@ -37,28 +40,29 @@ def _count_compliance_flags(compliance_text: str) -> int:
     return sum(1 for line in compliance_text.splitlines() if line.strip().startswith("- ["))
 
 
+# "- [High] UNILATERAL_TERMINATION: reason..." -> UNILATERAL_TERMINATION
+_FLAG_TYPE_RE = re.compile(r"- \[.*?\] ([^:]*)")
+
+# "- C001 (Indemnity): ..." -> Indemnity (first line of the block only)
+_CLAUSE_TYPE_RE = re.compile(r"- [^\n(]*\(([^)\n]*)\)")
+
+
 def _parse_red_flag_types(red_flags_text: str) -> List[str]:
     """
     red_flags_text looks like:
       - [High] UNILATERAL_TERMINATION: reason...
     We'll extract the flag type between bracket and colon.
     """
-    out = []
     if not red_flags_text or "No rule-based red flags" in red_flags_text:
-        return out
+        return []
 
+    out = []
     for line in red_flags_text.splitlines():
-        line = line.strip()
-        if not line.startswith("- ["):
-            continue
-        # try to extract between "] " and ":"
-        try:
-            after = line.split("] ", 1)[1]
-            flag_type = after.split(":", 1)[0].strip()
+        m = _FLAG_TYPE_RE.match(line.strip())
+        if m:
+            flag_type = m.group(1).strip()
             if flag_type:
                 out.append(flag_type)
-        except Exception:
-            continue
     return out
 
 
@@ -68,23 +72,16 @@ def _parse_top_clause_types(top_high_risk_text: str) -> List[str]:
       - C001 (Indemnity): ...
     We'll extract what's inside parentheses.
     """
-    out = []
     if not top_high_risk_text or "No High-risk clauses" in top_high_risk_text:
-        return out
+        return []
 
+    out = []
     for block in top_high_risk_text.split("\n\n"):
-        blk = block.strip()
-        if not blk.startswith("- "):
-            continue
-        # "- C001 (Indemnity): ..."
-        try:
-            left = blk.split("\n", 1)[0]
-            if "(" in left and ")" in left:
-                inside = left.split("(", 1)[1].split(")", 1)[0].strip()
-                if inside:
-                    out.append(inside)
-        except Exception:
-            continue
+        m = _CLAUSE_TYPE_RE.match(block.strip())
+        if m:
+            inside = m.group(1).strip()
+            if inside:
+                out.append(inside)
     return out
 
 
@@ -114,34 +111,54 @@ def append_contract_insight(
         "top_clause_types": _parse_top_clause_types(top_high_risk_text),
     }
 
-    with open(KB_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    with open(KB_PATH, "ab") as f:
+        f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
 
     return record
 
 
+def _tail_lines(path: Path, n: int, chunk_size: int = 1 << 16) -> List[bytes]:
+    """
+    Last n non-blank lines of a file, read backwards from EOF in chunks
+    (n <= 0 reads everything). Cost depends on n, not on the file size.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        while pos > 0:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            # More than n lines in hand means the (possibly partial) first one isn't needed
+            if n > 0 and buf.count(b"\n") > n:
+                lines = [ln for ln in buf.split(b"\n") if ln.strip()]
+                if len(lines) > n:
+                    return lines[-n:]
+
+    lines = [ln for ln in buf.split(b"\n") if ln.strip()]
+    return lines[-n:] if n > 0 else lines
+
+
 def _read_last_n(n: int = 200) -> List[Dict[str, Any]]:
     _ensure_kb_path()
-    lines = KB_PATH.read_text(encoding="utf-8").splitlines()
-    lines = [ln for ln in lines if ln.strip()]
-    tail = lines[-n:] if n and len(lines) > n else lines
     out = []
-    for ln in tail:
+    for ln in _tail_lines(KB_PATH, int(n or 0)):
         try:
-            out.append(json.loads(ln))
+            out.append(orjson.loads(ln))
         except Exception:
             continue
     return out
 
 
-def _count(items: List[str]) -> List[Tuple[str, int]]:
-    m: Dict[str, int] = {}
-    for x in items:
-        x = str(x).strip()
-        if not x:
-            continue
-        m[x] = m.get(x, 0) + 1
-    return sorted(m.items(), key=lambda t: t[1], reverse=True)
+def _count(items: List[str], limit: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    (value, count) pairs, most common first (ties keep first-seen order).
+    With a limit only the top entries are selected (heap, no full sort).
+    """
+    counts = Counter(x for x in (str(x).strip() for x in items) if x)
+    return counts.most_common(limit)
 
 
 def get_kb_dashboard(n: int = 200) -> Dict[str, Any]:
@@ -166,8 +183,8 @@ def get_kb_dashboard(n: int = 200) -> Dict[str, Any]:
         all_clause_types.extend(r.get("top_clause_types", []) or [])
         compliance_counts.append(int(r.get("compliance_flags_count", 0) or 0))
 
-    top_flags = _count(all_flags)[:10]
-    top_clause_types = _count(all_clause_types)[:10]
+    top_flags = _count(all_flags, limit=10)
+    top_clause_types = _count(all_clause_types, limit=10)
 
     avg_compliance_flags = round(sum(compliance_counts) / max(1, len(compliance_counts)), 2)
 
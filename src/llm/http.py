@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.config import LLM_MAX_WORKERS, OLLAMA_BASE_URL, OLLAMA_KEEP_ALIVE, OLLAMA_NUM_CTX
+
+
+# Enough pooled connections for the full-contract fan-out plus other handlers
+_POOL_SIZE = max(16, LLM_MAX_WORKERS)
+
+# Hard cap on a decoded /api/chat response body. Real replies are bounded by
+# num_ctx (a few tens of KB); this only stops a runaway or misbehaving server
+# from being buffered into memory.
+MAX_RESPONSE_BYTES = 1_000_000
+
+
+class ResponseTooLarge(RuntimeError):
+    pass
+
+
+def _check_size(size: int) -> None:
+    if size > MAX_RESPONSE_BYTES:
+        raise ResponseTooLarge(f"Ollama response exceeded {MAX_RESPONSE_BYTES} bytes")
+
+
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    # No transparent retries: a timed-out generation must not be silently re-run
+    adapter = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# One pooled session for every blocking Ollama call: connections stay open
+# between clauses instead of a new TCP handshake per request.
+SESSION = _make_session()
+
+
+def with_server_options(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Adds keep_alive (model stays resident between calls) and a fixed num_ctx.
+    Caller-supplied options win.
+    """
+    return {
+        **payload,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": {"num_ctx": OLLAMA_NUM_CTX, **payload.get("options", {})},
+    }
+
+
+def post_chat(payload: Dict[str, Any], timeout: float) -> str:
+    """
+    POSTs a /api/chat payload on the shared session; returns the message content.
+    The (decompressed) body is read incrementally, up to MAX_RESPONSE_BYTES.
+    """
+    body = bytearray()
+    with SESSION.post(
+        f"{OLLAMA_BASE_URL}/api/chat", json=with_server_options(payload), timeout=timeout, stream=True
+    ) as r:
+        r.raise_for_status()
+        for chunk in r.iter_content(chunk_size=1 << 16):
+            body += chunk
+            _check_size(len(body))
+    return json.loads(body)["message"]["content"]
+
+
+def stream_chat(payload: Dict[str, Any], timeout: float) -> Iterator[str]:
+    """
+    POSTs a /api/chat payload with streaming on; yields content pieces as the
+    model produces them. Closing the generator closes the response, which
+    makes Ollama stop generating.
+    """
+    body = with_server_options({**payload, "stream": True})
+    with SESSION.post(f"{OLLAMA_BASE_URL}/api/chat", json=body, timeout=timeout, stream=True) as r:
+        r.raise_for_status()
+        received = 0
+        for line in r.iter_lines():
+            received += len(line)
+            _check_size(received)
+            if not line:
+                continue
+            chunk = json.loads(line)
+            piece = (chunk.get("message") or {}).get("content", "")
+            if piece:
+                yield piece
+            if chunk.get("done"):
+                break
+
+
+T = TypeVar("T")
+
+# Async calls run on one long-lived event loop (daemon thread) with one
+# AsyncClient, so keep-alive connections survive between analyses instead of
+# a new loop + client + TCP connections per full-contract run.
+_ASYNC_LOCK = threading.Lock()
+_ASYNC_RUNTIME: Optional[Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = None
+
+
+def _async_runtime() -> Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]:
+    global _ASYNC_RUNTIME
+    if _ASYNC_RUNTIME is None:
+        with _ASYNC_LOCK:
+            if _ASYNC_RUNTIME is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="ollama-async", daemon=True).start()
+                client = httpx.AsyncClient(
+                    timeout=180,
+                    limits=httpx.Limits(max_connections=_POOL_SIZE, max_keepalive_connections=_POOL_SIZE),
+                )
+                _ASYNC_RUNTIME = (loop, client)
+    return _ASYNC_RUNTIME
+
+
+async def post_chat_async(client: httpx.AsyncClient, payload: Dict[str, Any]) -> str:
+    """
+    post_chat for the shared AsyncClient, with the same response size cap.
+    """
+    body = bytearray()
+    async with client.stream("POST", f"{OLLAMA_BASE_URL}/api/chat", json=with_server_options(payload)) as r:
+        r.raise_for_status()
+        async for chunk in r.aiter_bytes():
+            body += chunk
+            _check_size(len(body))
+    return json.loads(body)["message"]["content"]
+
+
+def submit_async(fn: Callable[[httpx.AsyncClient], Awaitable[T]]) -> "Future[T]":
+    """
+    Runs fn(shared_async_client) on the shared event loop; callable from any thread.
+    Cancelling the returned future cancels the coroutine.
+    """
+    loop, client = _async_runtime()
+    return asyncio.run_coroutine_threadsafe(fn(client), loop)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Optional
+
+# Leading ```json / ``` and trailing ``` in one pass
+_FENCES = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.I)
+
+_DECODER = json.JSONDecoder()
+
+
+def strip_code_fences(text: str) -> str:
+    """
+    Removes markdown code fences if present.
+    Handles: ```json ... ``` and ``` ... ```
+    """
+    return _FENCES.sub("", (text or "").strip()).strip()
+
+
+def parse_llm_json(text: str, opener: str = "{") -> Optional[Any]:
+    """
+    Decodes the first JSON value starting at the first `opener` ("{" or "[")
+    in model output, ignoring any leading/trailing chatter.
+    Returns None when there is no opener; raises json.JSONDecodeError when
+    what follows it isn't valid JSON.
+    """
+    start = (text or "").find(opener)
+    if start == -1:
+        return None
+    value, _ = _DECODER.raw_decode(text, start)
+    return value
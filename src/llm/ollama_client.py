@@ -1,11 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import queue
 import re
-from typing import Dict, Any
-import requests
+from typing import Dict, Any, Generator, Iterator, List, Optional, Tuple
+import httpx
 
-from src.config import OLLAMA_BASE_URL, OLLAMA_MODEL
+from src.cache import PersistentCache, clause_key, text_key
+from src.config import OLLAMA_MODEL, OLLAMA_NUM_CTX, LLM_MAX_WORKERS, LLM_BATCH_SIZE, LLM_MAX_CLAUSE_CHARS
+from src.llm.http import post_chat_async, stream_chat, submit_async
+from src.llm.json_utils import parse_llm_json, strip_code_fences
+
+
+# (model, prompt version, truncation limit, normalized clause digest) -> analysis;
+# only successfully parsed outputs are kept
+_ANALYSIS_CACHE = PersistentCache("analysis", maxsize=512)
+
+# Bump when the parsed result shape changes without a prompt edit
+_SCHEMA_VERSION = 1
+
+
+def _cache_key(clause_text: str) -> str:
+    return f"{OLLAMA_MODEL}:{_PROMPT_VERSION}:{LLM_MAX_CLAUSE_CHARS}:{clause_key(clause_text)}"
 
 
 SYSTEM_PROMPT = """
@@ -26,35 +43,100 @@ Schema (exact keys):
 }
 """
 
+BATCH_SYSTEM_PROMPT = """
+You are a contract clause analysis engine for Indian SMEs.
+You will receive several numbered clauses. Analyze each clause independently.
 
-def _strip_code_fences(text: str) -> str:
-    """
-    Removes markdown code fences if present.
-    Handles: ```json ... ``` and ``` ... ```
-    """
-    t = text.strip()
+Hard constraints:
+- Output MUST be a valid JSON object only: {"clauses": [...]}, with one
+  array element per clause.
+- Do NOT wrap output in markdown fences like ```json.
+- Do NOT include commentary outside JSON.
 
-    # Remove starting fence
-    t = re.sub(r"^\s*```json\s*", "", t, flags=re.IGNORECASE)
-    t = re.sub(r"^\s*```\s*", "", t)
+Schema for each "clauses" element (exact keys):
+{
+  "idx": 1,
+  "clause_type": "...",
+  "explanation": "...",
+  "risk_level": "Low|Medium|High",
+  "risk_reason": "...",
+  "mitigation_suggestion": "..."
+}
+"""
 
-    # Remove ending fence
-    t = re.sub(r"\s*```\s*$", "", t)
+# Changes with either prompt, so edited prompts don't hit stale on-disk entries
+_PROMPT_VERSION = f"v{_SCHEMA_VERSION}-{text_key(SYSTEM_PROMPT + BATCH_SYSTEM_PROMPT)[:8]}"
 
-    return t.strip()
+# Alternate spellings the model sometimes uses for schema keys
+_KEY_ALIASES = {
+    "explain": "explanation",
+    "risk reason": "risk_reason",
+    "mitigation suggestion": "mitigation_suggestion",
+}
 
 
-def _extract_json_object(text: str) -> str:
+class _JsonObjectScanner:
     """
-    Extract JSON object substring from first '{' to last '}'.
-    This is robust when the model adds leading/trailing text.
+    Incremental scanner for the first top-level JSON object in streamed model
+    output. feed() returns the (key, value) members completed so far;
+    `closed` turns True once the object's closing brace has arrived.
     """
-    t = text.strip()
-    start = t.find("{")
-    end = t.rfind("}")
-    if start == -1 or end == -1 or end <= start:
-        return ""
-    return t[start : end + 1].strip()
+
+    def __init__(self):
+        self.text = ""
+        self.closed = False
+        self.end = -1  # index just past the closing brace
+        self._pos = 0
+        self._depth = 0
+        self._in_str = False
+        self._escaped = False
+        self._member_start = -1  # -1 until the opening brace is seen
+
+    def _member(self, end: int) -> List[Tuple[str, Any]]:
+        segment = self.text[self._member_start : end].strip()
+        if not segment:
+            return []
+        try:
+            member = json.loads("{" + segment + "}")
+        except json.JSONDecodeError:
+            # Left for the full parse at the end to report
+            return []
+        return [(_KEY_ALIASES.get(k, k), v) for k, v in member.items()]
+
+    def feed(self, piece: str) -> List[Tuple[str, Any]]:
+        self.text += piece
+        members: List[Tuple[str, Any]] = []
+        for i in range(self._pos, len(self.text)):
+            if self.closed:
+                break
+            ch = self.text[i]
+            if self._in_str:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_str = False
+            elif self._member_start == -1:
+                # Skip anything (fences, chatter) before the object
+                if ch == "{":
+                    self._depth = 1
+                    self._member_start = i + 1
+            elif ch == '"':
+                self._in_str = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    members.extend(self._member(i))
+                    self.closed = True
+                    self.end = i + 1
+            elif ch == "," and self._depth == 1:
+                members.extend(self._member(i))
+                self._member_start = i + 1
+        self._pos = len(self.text)
+        return members
 
 
 def _normalize_keys(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -85,56 +167,318 @@ def _normalize_keys(data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def analyze_clause_with_llm(clause_text: str) -> Dict[str, Any]:
+_WS_RUN = re.compile(r"\s+")
+
+
+def compact_for_prompt(text: str, max_chars: Optional[int] = LLM_MAX_CLAUSE_CHARS) -> str:
+    """
+    Clause text as embedded in a prompt: whitespace runs collapsed to one
+    space and capped at max_chars (marked with "[...]" when cut; None = no cap).
+    """
+    t = _WS_RUN.sub(" ", text or "").strip()
+    if max_chars is not None and len(t) > max_chars:
+        return t[:max_chars].rstrip() + " [...]"
+    return t
+
+
+def _build_payload(clause_text: str) -> Dict[str, Any]:
     user_prompt = f"""
 Analyze this contract clause and return ONLY JSON matching the schema.
 
 Clause:
 \"\"\"
-{clause_text}
+{compact_for_prompt(clause_text)}
 \"\"\"
 """
 
-    payload = {
+    return {
         "model": OLLAMA_MODEL,
         "messages": [
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
         ],
         "stream": False,
-        "options": {"temperature": 0.1},
+        # Constrained decoding: the server can only emit a JSON object
+        "format": "json",
+        "options": {"temperature": 0},
     }
 
-    r = requests.post(f"{OLLAMA_BASE_URL}/api/chat", json=payload, timeout=120)
-    r.raise_for_status()
-
-    raw = r.json()["message"]["content"]
 
+def _parse_model_output(raw: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Returns (result, ok). ok is False when the output could not be parsed,
+    so callers don't cache a one-off bad generation.
+    """
     # 1) Strip fences
-    cleaned = _strip_code_fences(raw)
+    cleaned = strip_code_fences(raw)
 
-    # 2) Extract JSON object region
-    json_blob = _extract_json_object(cleaned)
-    if not json_blob:
+    # 2) Parse the first JSON object (leading/trailing text is ignored)
+    try:
+        parsed = parse_llm_json(cleaned)
+    except json.JSONDecodeError as e:
         return {
             "clause_type": "Unknown",
             "explanation": cleaned,
             "risk_level": "Unclear",
-            "risk_reason": "No JSON object found in model output (missing '{' or '}').",
+            "risk_reason": f"JSONDecodeError: {e}",
             "mitigation_suggestion": "Review manually.",
-        }
+        }, False
 
-    # 3) Parse JSON
-    try:
-        parsed = json.loads(json_blob)
-    except json.JSONDecodeError as e:
+    if parsed is None:
         return {
             "clause_type": "Unknown",
             "explanation": cleaned,
             "risk_level": "Unclear",
-            "risk_reason": f"JSONDecodeError: {e}",
+            "risk_reason": "No JSON object found in model output (missing '{').",
             "mitigation_suggestion": "Review manually.",
-        }
+        }, False
+
+    # 3) Normalize keys
+    return _normalize_keys(parsed), True
+
+
+def _build_batch_payload(clause_texts: List[str]) -> Dict[str, Any]:
+    numbered = "\n\n".join(
+        f"Clause {i}:\n\"\"\"\n{compact_for_prompt(t)}\n\"\"\"" for i, t in enumerate(clause_texts, start=1)
+    )
+    user_prompt = f"""
+Analyze each of these {len(clause_texts)} contract clauses and return ONLY the JSON object.
+Use the clause number as "idx".
+
+{numbered}
+"""
+
+    return {
+        "model": OLLAMA_MODEL,
+        "messages": [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        "stream": False,
+        # Constrained decoding: the server can only emit a JSON object
+        "format": "json",
+        "options": {"temperature": 0},
+    }
+
+
+# Batched prompts must fit in num_ctx together with the reply: Ollama drops
+# the start of an over-long prompt (system prompt, first clauses) silently.
+# Tokens are estimated from characters; ~3 chars/token is on the safe side
+# for English contract text.
+_CHARS_PER_TOKEN = 3
+_BATCH_OVERHEAD_TOKENS = 100      # chat template + batch instructions
+_CLAUSE_WRAPPER_TOKENS = 10       # "Clause N:" and the quotes around it
+_REPLY_TOKENS_PER_CLAUSE = 300    # that clause's object in the JSON reply
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def _pack_batches(clause_texts: List[str], indices: List[int], batch_size: int) -> List[List[int]]:
+    """
+    Groups indices (in order) into batches of at most batch_size clauses
+    whose prompt plus expected reply fits in OLLAMA_NUM_CTX. A clause too
+    large to share a prompt ends up alone (single-clause prompt).
+    """
+    budget = OLLAMA_NUM_CTX - _BATCH_OVERHEAD_TOKENS - _estimate_tokens(BATCH_SYSTEM_PROMPT)
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for i in indices:
+        cost = (
+            _estimate_tokens(compact_for_prompt(clause_texts[i]))
+            + _CLAUSE_WRAPPER_TOKENS
+            + _REPLY_TOKENS_PER_CLAUSE
+        )
+        if current and (len(current) >= batch_size or used + cost > budget):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_batch_output(raw: str, n: int) -> List[Optional[Dict[str, Any]]]:
+    """
+    Maps a {"clauses": [...]} reply (or a bare array) back to clause positions.
+    Entries the model skipped or garbled are None (caller falls back per clause).
+    """
+    out: List[Optional[Dict[str, Any]]] = [None] * n
+
+    cleaned = strip_code_fences(raw)
+    try:
+        data = parse_llm_json(cleaned, opener="[" if cleaned.startswith("[") else "{")
+    except json.JSONDecodeError:
+        return out
+    items = data.get("clauses") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return out
+
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            idx = int(item.get("idx", 0))
+        except (TypeError, ValueError):
+            continue
+        if 1 <= idx <= n and out[idx - 1] is None:
+            out[idx - 1] = _normalize_keys(item)
+    return out
+
+
+def analyze_clause_stream(
+    clause_text: str, use_cache: bool = True
+) -> Generator[Tuple[str, Any], None, Dict[str, Any]]:
+    """
+    Streams the analysis: yields (key, value) as each top-level field of the
+    model's JSON object closes, and returns the final normalized result
+    (StopIteration.value). Reading stops at the object's closing brace, so
+    any trailing commentary is never generated.
+    """
+    key = _cache_key(clause_text)
+    cached = _ANALYSIS_CACHE.get(key) if use_cache else None
+    if cached is not None:
+        yield from cached.items()
+        return cached
+
+    scanner = _JsonObjectScanner()
+    pieces = stream_chat(_build_payload(clause_text), timeout=120)
+    try:
+        for piece in pieces:
+            yield from scanner.feed(piece)
+            if scanner.closed:
+                break
+    finally:
+        pieces.close()
+
+    raw = scanner.text[: scanner.end] if scanner.closed else scanner.text
+    result, ok = _parse_model_output(raw)
+    if ok:
+        _ANALYSIS_CACHE.put(key, result)
+    return result
+
+
+def analyze_clause_with_llm(clause_text: str, use_cache: bool = True) -> Dict[str, Any]:
+    stream = analyze_clause_stream(clause_text, use_cache=use_cache)
+    while True:
+        try:
+            next(stream)
+        except StopIteration as stop:
+            return stop.value
+
+
+async def analyze_clause_with_llm_async(
+    clause_text: str,
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+) -> Dict[str, Any]:
+    """
+    Async variant of analyze_clause_with_llm.
+    The semaphore bounds how many requests are in flight against Ollama.
+    """
+    key = _cache_key(clause_text)
+    cached = _ANALYSIS_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    payload = _build_payload(clause_text)
+
+    async with semaphore:
+        raw = await post_chat_async(client, payload)
+
+    result, ok = _parse_model_output(raw)
+    if ok:
+        _ANALYSIS_CACHE.put(key, result)
+    return result
+
+
+async def analyze_clauses_batch_async(
+    clause_texts: List[str],
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+) -> List[Dict[str, Any]]:
+    """
+    Analyzes several clauses with a single Ollama prompt (amortizes the
+    request + system prompt cost). Clauses missing from the model's JSON
+    array are re-analyzed individually.
+    """
+    if len(clause_texts) == 1:
+        return [await analyze_clause_with_llm_async(clause_texts[0], client, semaphore)]
+
+    payload = _build_batch_payload(clause_texts)
+
+    async with semaphore:
+        raw = await post_chat_async(client, payload)
+
+    parsed = _parse_batch_output(raw, len(clause_texts))
+
+    for text, result in zip(clause_texts, parsed):
+        if result is not None:
+            _ANALYSIS_CACHE.put(_cache_key(text), result)
+
+    missing = [i for i, result in enumerate(parsed) if result is None]
+    if missing:
+        fallbacks = await asyncio.gather(
+            *[analyze_clause_with_llm_async(clause_texts[i], client, semaphore) for i in missing]
+        )
+        for i, result in zip(missing, fallbacks):
+            parsed[i] = result
+
+    return parsed
+
+
+def iter_clause_analyses(
+    clause_texts: List[str],
+    max_concurrency: int = LLM_MAX_WORKERS,
+    batch_size: int = LLM_BATCH_SIZE,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Sends all clauses to Ollama concurrently (packed up to batch_size per
+    prompt, as many as fit the context window)
+    and yields (index, result) in completion order, so callers can report
+    progress as results arrive. Cached clauses are yielded first.
+    """
+    if not clause_texts:
+        return
+
+    misses: List[int] = []
+    for idx, text in enumerate(clause_texts):
+        cached = _ANALYSIS_CACHE.get(_cache_key(text))
+        if cached is not None:
+            yield idx, cached
+        else:
+            misses.append(idx)
+
+    if not misses:
+        return
+
+    chunks = _pack_batches(clause_texts, misses, max(1, batch_size))
+    done: "queue.Queue[Tuple[List[int], Optional[List[Dict[str, Any]]], Optional[BaseException]]]" = queue.Queue()
+
+    async def _run_all(client: httpx.AsyncClient) -> None:
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def _chunk(indices: List[int]) -> None:
+            try:
+                results = await analyze_clauses_batch_async([clause_texts[i] for i in indices], client, semaphore)
+            except Exception as e:
+                done.put((indices, None, e))
+            else:
+                done.put((indices, results, None))
+
+        await asyncio.gather(*(_chunk(chunk) for chunk in chunks))
+
+    future = submit_async(_run_all)
+    try:
+        for _ in chunks:
+            indices, results, error = done.get()
+            if error is not None:
+                raise error
+            yield from zip(indices, results)
+    finally:
+        # Consumer stopped early (or a request failed): don't leave requests running
+        future.cancel()
 
-    # 4) Normalize keys
-    return _normalize_keys(parsed)
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
 import json
-import re
 from typing import Dict, Any, List
-import requests
 
-from src.config import OLLAMA_BASE_URL, OLLAMA_MODEL
+from src.cache import PersistentCache, clause_key, text_key
+from src.config import OLLAMA_MODEL
+from src.llm.http import post_chat
+from src.llm.json_utils import parse_llm_json, strip_code_fences
+from src.llm.ollama_client import compact_for_prompt
+
+
+# (model, prompt version, perspective, normalized clause digest) -> parsed rewrite suggestion
+_REWRITE_CACHE = PersistentCache("rewrite", maxsize=256)
+
+# Bump when the parsed result shape changes without a prompt edit
+_SCHEMA_VERSION = 1
 
 
 _SYSTEM_PROMPT = """
@@ -24,22 +33,8 @@ Return JSON with EXACT keys:
 - negotiation_points (array of strings)
 """
 
-
-def _strip_code_fences(text: str) -> str:
-    t = (text or "").strip()
-    t = re.sub(r"^\s*```json\s*", "", t, flags=re.IGNORECASE)
-    t = re.sub(r"^\s*```\s*", "", t)
-    t = re.sub(r"\s*```\s*$", "", t)
-    return t.strip()
-
-
-def _extract_json_object(text: str) -> str:
-    t = text.strip()
-    start = t.find("{")
-    end = t.rfind("}")
-    if start == -1 or end == -1 or end <= start:
-        return ""
-    return t[start : end + 1].strip()
+# Changes with the prompt, so an edited prompt doesn't hit stale on-disk entries
+_PROMPT_VERSION = f"v{_SCHEMA_VERSION}-{text_key(_SYSTEM_PROMPT)[:8]}"
 
 
 def rewrite_clause(clause_text: str, party_perspective: str = "SME") -> Dict[str, Any]:
@@ -49,6 +44,11 @@ def rewrite_clause(clause_text: str, party_perspective: str = "SME") -> Dict[str
       - propose balanced SME-friendly rewrite
       - provide negotiation points
     """
+    key = f"{OLLAMA_MODEL}:{_PROMPT_VERSION}:{party_perspective}:{clause_key(clause_text)}"
+    cached = _REWRITE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
     user_prompt = f"""
 Assess if this clause is unfavorable to a small/medium business (SME).
 If unfavorable, propose a balanced, SME-friendly rewrite (not one-sided).
@@ -58,7 +58,7 @@ Perspective: {party_perspective}
 
 Clause:
 \"\"\"
-{clause_text}
+{compact_for_prompt(clause_text, max_chars=None)}
 \"\"\"
 """
 
@@ -69,30 +69,28 @@ Clause:
             {"role": "user", "content": user_prompt},
         ],
         "stream": False,
-        "options": {"temperature": 0.2},
+        # Constrained decoding: the server can only emit a JSON object
+        "format": "json",
+        "options": {"temperature": 0.0},
     }
 
-    r = requests.post(f"{OLLAMA_BASE_URL}/api/chat", json=payload, timeout=180)
-    r.raise_for_status()
-
-    raw = r.json()["message"]["content"]
-    cleaned = _strip_code_fences(raw)
-    blob = _extract_json_object(cleaned)
+    raw = post_chat(payload, timeout=180)
+    cleaned = strip_code_fences(raw)
 
-    if not blob:
+    try:
+        data = parse_llm_json(cleaned)
+    except json.JSONDecodeError:
         return {
             "is_unfavorable": False,
-            "why_unfavorable": "No JSON object found in model output.",
+            "why_unfavorable": "Model output was not valid JSON.",
             "suggested_rewrite": cleaned,
             "negotiation_points": [],
         }
 
-    try:
-        data = json.loads(blob)
-    except json.JSONDecodeError:
+    if data is None:
         return {
             "is_unfavorable": False,
-            "why_unfavorable": "Model output was not valid JSON.",
+            "why_unfavorable": "No JSON object found in model output.",
             "suggested_rewrite": cleaned,
             "negotiation_points": [],
         }
@@ -102,12 +100,14 @@ Clause:
     if not isinstance(negotiation_points, list):
         negotiation_points = []
 
-    return {
+    out = {
         "is_unfavorable": bool(data.get("is_unfavorable", False)),
         "why_unfavorable": str(data.get("why_unfavorable", "") or ""),
         "suggested_rewrite": str(data.get("suggested_rewrite", "") or ""),
         "negotiation_points": [str(x) for x in negotiation_points if str(x).strip()],
     }
+    _REWRITE_CACHE.put(key, out)
+    return out
 
 
 
@@ -3,6 +3,8 @@ from __future__ import annotations
 import re
 from typing import Dict, Any, List, Tuple
 
+from src.nlp.sentences import iter_hit_sentences, scan_pattern
+
 
 # (label, severity_weight, regex)
 AMBIGUITY_PATTERNS: List[Tuple[str, int, re.Pattern]] = [
@@ -11,7 +13,7 @@ AMBIGUITY_PATTERNS: List[Tuple[str, int, re.Pattern]] = [
     ("promptly / asap", 2, re.compile(r"\b(promptly|as soon as possible|asap)\b", re.I)),
     ("material / substantial", 3, re.compile(r"\b(material|substantial)\b", re.I)),
     ("from time to time", 2, re.compile(r"\bfrom time to time\b", re.I)),
-    ("including but not limited to", 2, re.compile(r"\bincluding\b.*\bnot limited to\b", re.I)),
+    ("including but not limited to", 2, re.compile(r"\bincluding\b[^\n]{0,200}?\bnot limited to\b", re.I)),
     ("sole discretion", 4, re.compile(r"\bsole discretion\b|\bat (its|their) discretion\b", re.I)),
     ("to the satisfaction of", 3, re.compile(r"\bto the satisfaction of\b|\bsatisfactory to\b", re.I)),
     ("as determined by", 3, re.compile(r"\bas determined by\b|\bas decided by\b", re.I)),
@@ -21,14 +23,21 @@ AMBIGUITY_PATTERNS: List[Tuple[str, int, re.Pattern]] = [
     ("etc / and so on", 1, re.compile(r"\betc\.\b|\band so on\b", re.I)),
 ]
 
-SENT_SPLIT = re.compile(r"(?<=[\.\n;:])\s+")
+# Every pattern fused into one alternation, used to find the sentences worth
+# checking in a single left-to-right pass
+_ANY_AMBIGUITY = scan_pattern(
+    re.compile("|".join(f"(?:{pat.pattern})" for _, _, pat in AMBIGUITY_PATTERNS), re.I)
+)
 
 
-def _snippet(sentence: str, match_span: Tuple[int, int], window: int = 70) -> str:
+def _snippet(text: str, match_span: Tuple[int, int], bounds: Tuple[int, int], window: int = 70) -> str:
+    """
+    Text around the match, clipped to its sentence bounds.
+    """
     s, e = match_span
-    start = max(0, s - window)
-    end = min(len(sentence), e + window)
-    return sentence[start:end].strip()
+    start = max(bounds[0], s - window)
+    end = min(bounds[1], e + window)
+    return text[start:end].strip()
 
 
 def detect_ambiguity(text: str, max_hits: int = 20) -> Dict[str, Any]:
@@ -46,17 +55,17 @@ def detect_ambiguity(text: str, max_hits: int = 20) -> Dict[str, Any]:
       }
     """
     t = text or ""
-    sentences = SENT_SPLIT.split(t)
 
     hits: List[Dict[str, Any]] = []
     score = 0
 
-    for sent in sentences:
-        if not sent or len(sent) < 8:
+    # Only sentences with at least one hit are visited; they're never sliced out
+    for start, end in iter_hit_sentences(t, _ANY_AMBIGUITY):
+        if end - start < 8:
             continue
 
         for label, weight, pat in AMBIGUITY_PATTERNS:
-            m = pat.search(sent)
+            m = pat.search(t, start, end)
             if not m:
                 continue
 
@@ -65,7 +74,7 @@ def detect_ambiguity(text: str, max_hits: int = 20) -> Dict[str, Any]:
                     "label": label,
                     "weight": weight,
                     "match": m.group(0),
-                    "snippet": _snippet(sent, (m.start(), m.end())),
+                    "snippet": _snippet(t, (m.start(), m.end()), (start, end)),
                 }
             )
             score += weight
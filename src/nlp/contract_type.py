@@ -5,9 +5,15 @@ import re
 from dataclasses import dataclass
 from typing import Dict, Any, List, Tuple
 
-import requests
+from src.config import OLLAMA_MODEL
+from src.llm.http import post_chat
+from src.llm.json_utils import parse_llm_json, strip_code_fences
+from src.nlp.sentences import scan_pattern, scan_text
 
-from src.config import OLLAMA_BASE_URL, OLLAMA_MODEL
+try:
+    import ahocorasick
+except ImportError:  # optional: falls back to per-token substring checks
+    ahocorasick = None
 
 
 CONTRACT_TYPES = [
@@ -60,21 +66,86 @@ STRONG_PATTERNS: List[Tuple[str, re.Pattern, int]] = [
 ]
 
 
+# All strong patterns in one alternation (group s<i> = STRONG_PATTERNS[i]), so
+# the text is scanned once (by RE2 when available) instead of once per
+# pattern. The phrases don't overlap, so one pattern's match can't hide another's.
+_STRONG_ANY = scan_pattern(
+    re.compile(
+        "|".join(f"(?P<s{i}>{pattern.pattern})" for i, (_, pattern, _) in enumerate(STRONG_PATTERNS)),
+        re.I,
+    )
+)
+
+
+def _strong_hits(text: str) -> List[int]:
+    """
+    Indexes into STRONG_PATTERNS of the patterns that match text, in order.
+    """
+    seen = set()
+    for m in _STRONG_ANY.finditer(scan_text(text)):
+        i = int(m.lastgroup[1:])
+        # RE2's \b is ASCII-only (looser next to accented letters): confirm
+        if i not in seen and STRONG_PATTERNS[i][1].match(text, m.start()):
+            seen.add(i)
+            if len(seen) == len(STRONG_PATTERNS):
+                break
+    return sorted(seen)
+
+
 @dataclass
 class ContractTypeResult:
+    # No per-instance __dict__; declared by hand since dataclass(slots=True) needs 3.10+
+    __slots__ = ("contract_type", "confidence", "method", "evidence")
+
     contract_type: str
     confidence: float          # 0.0 - 1.0
     method: str                # "rules" | "llm"
     evidence: List[str]        # short evidence strings
 
 
-def _token_score(text: str, tokens: List[str]) -> int:
-    t = text.lower()
-    score = 0
-    for tok in tokens:
-        if tok.lower() in t:
-            score += 1
-    return score
+# (token, lowercased token) per contract type, lowered once at import
+_RULE_SETS_LC: Dict[str, List[Tuple[str, str]]] = {
+    ctype: [(tok, tok.lower()) for tok in toks] for ctype, toks in RULE_SETS.items()
+}
+
+
+def _build_automaton():
+    """
+    One Aho-Corasick automaton over every bucket keyword; each word maps to
+    the (contract_type, token) pairs that list it.
+    """
+    if ahocorasick is None:
+        return None
+    words: Dict[str, List[Tuple[str, str]]] = {}
+    for ctype, pairs in _RULE_SETS_LC.items():
+        for tok, tok_lc in pairs:
+            words.setdefault(tok_lc, []).append((ctype, tok))
+    automaton = ahocorasick.Automaton()
+    for word, owners in words.items():
+        automaton.add_word(word, owners)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AC = _build_automaton()
+
+
+def _keyword_hits(text_lc: str) -> Dict[str, List[str]]:
+    """
+    Keywords found in text_lc (already lowercased; substring match) per
+    contract type, in RULE_SETS order. Each keyword counts once however often
+    it occurs.
+    """
+    if _KEYWORD_AC is None:
+        return {
+            ctype: [tok for tok, tok_lc in pairs if tok_lc in text_lc]
+            for ctype, pairs in _RULE_SETS_LC.items()
+        }
+
+    found = set()
+    for _, owners in _KEYWORD_AC.iter(text_lc):
+        found.update(owners)
+    return {ctype: [tok for tok in toks if (ctype, tok) in found] for ctype, toks in RULE_SETS.items()}
 
 
 def _rules_classify(text: str) -> ContractTypeResult:
@@ -88,19 +159,16 @@ def _rules_classify(text: str) -> ContractTypeResult:
     scores: Dict[str, int] = {k: 0 for k in RULE_SETS.keys()}
 
     # Strong pattern boosts
-    for ctype, pattern, boost in STRONG_PATTERNS:
-        if pattern.search(t):
-            scores[ctype] += boost
-            evidence[ctype].append(f"pattern:{pattern.pattern}")
-
-    # Keyword scoring
-    for ctype, toks in RULE_SETS.items():
-        s = _token_score(t, toks)
-        scores[ctype] += s
-        if s > 0:
-            # Add only a few evidence tokens (avoid dumping everything)
-            hit_tokens = [tok for tok in toks if tok.lower() in t.lower()][:5]
-            evidence[ctype].extend([f"kw:{x}" for x in hit_tokens])
+    for i in _strong_hits(t):
+        ctype, pattern, boost = STRONG_PATTERNS[i]
+        scores[ctype] += boost
+        evidence[ctype].append(f"pattern:{pattern.pattern}")
+
+    # Keyword scoring (single pass over the text)
+    for ctype, hit_tokens in _keyword_hits(t.lower()).items():
+        scores[ctype] += len(hit_tokens)
+        # Add only a few evidence tokens (avoid dumping everything)
+        evidence[ctype].extend([f"kw:{x}" for x in hit_tokens[:5]])
 
     # Pick best
     ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
@@ -119,23 +187,6 @@ def _rules_classify(text: str) -> ContractTypeResult:
     return ContractTypeResult(contract_type=best_type, confidence=round(confidence, 2), method="rules", evidence=ev)
 
 
-def _strip_code_fences(text: str) -> str:
-    txt = (text or "").strip()
-    txt = re.sub(r"^\s*```json\s*", "", txt, flags=re.IGNORECASE)
-    txt = re.sub(r"^\s*```\s*", "", txt)
-    txt = re.sub(r"\s*```\s*$", "", txt)
-    return txt.strip()
-
-
-def _extract_json_object(text: str) -> str:
-    t = text.strip()
-    s = t.find("{")
-    e = t.rfind("}")
-    if s == -1 or e == -1 or e <= s:
-        return ""
-    return t[s : e + 1].strip()
-
-
 def _llm_classify(text: str) -> ContractTypeResult:
     """
     LLM fallback via local Ollama.
@@ -172,24 +223,20 @@ Text:
             {"role": "user", "content": user},
         ],
         "stream": False,
+        # Constrained decoding: the server can only emit a JSON object
+        "format": "json",
         "options": {"temperature": 0.0},
     }
 
-    r = requests.post(f"{OLLAMA_BASE_URL}/api/chat", json=payload, timeout=120)
-    r.raise_for_status()
-
-    raw = r.json()["message"]["content"]
-    cleaned = _strip_code_fences(raw)
-    blob = _extract_json_object(cleaned)
-
-    if not blob:
-        return ContractTypeResult(contract_type="unknown", confidence=0.0, method="llm", evidence=["llm:no_json"])
-
+    raw = post_chat(payload, timeout=120)
     try:
-        data = json.loads(blob)
+        data = parse_llm_json(strip_code_fences(raw))
     except json.JSONDecodeError:
         return ContractTypeResult(contract_type="unknown", confidence=0.0, method="llm", evidence=["llm:bad_json"])
 
+    if data is None:
+        return ContractTypeResult(contract_type="unknown", confidence=0.0, method="llm", evidence=["llm:no_json"])
+
     ctype = data.get("contract_type", "unknown")
     if ctype not in CONTRACT_TYPES:
         ctype = "unknown"
@@ -1,45 +1,63 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from src.nlp.sentences import iter_hit_sentences, scan_pattern
 
 # Prohibition first (most specific)
-PROHIBITION_PAT = re.compile(
-    r"\b(shall not|must not|may not|is prohibited from|are prohibited from|will not)\b",
-    re.I,
-)
+_PROHIBITION_TERMS = r"shall not|must not|may not|is prohibited from|are prohibited from|will not"
 
 # Obligation patterns
-OBLIGATION_PAT = re.compile(
-    r"\b(shall|must|is required to|are required to|undertakes to|agrees to)\b",
-    re.I,
-)
+_OBLIGATION_TERMS = r"shall|must|is required to|are required to|undertakes to|agrees to"
 
 # Rights / permissions patterns
-RIGHT_PAT = re.compile(
-    r"\b(may|can|is entitled to|are entitled to|has the right to|have the right to)\b",
+_RIGHT_TERMS = r"may|can|is entitled to|are entitled to|has the right to|have the right to"
+
+# All three in one pass, in precedence order (at the same position "shall not"
+# wins over "shall"). Spaces match any whitespace run, as sentences are only
+# whitespace-collapsed after they're found.
+DEONTIC_PAT = re.compile(
+    r"\b(?:(?P<prohibition>{})|(?P<obligation>{})|(?P<right>{}))\b".format(
+        *(terms.replace(" ", r"\s+") for terms in (_PROHIBITION_TERMS, _OBLIGATION_TERMS, _RIGHT_TERMS))
+    ),
     re.I,
 )
 
-# Split into candidates (simple + robust)
-SENT_SPLIT = re.compile(r"(?<=[\.\n;:])\s+")
+# Same pattern for the whole-text sentence scan (RE2 when available)
+_DEONTIC_SCAN = scan_pattern(DEONTIC_PAT)
+
+_PRECEDENCE = {"prohibition": 0, "obligation": 1, "right": 2}
+
+_WS_RUN = re.compile(r"\s+")
 
 
 def _clean(s: str) -> str:
     s = (s or "").strip()
-    s = re.sub(r"\s+", " ", s)
+    s = _WS_RUN.sub(" ", s)
     return s
 
 
 def _dedupe(items: List[str]) -> List[str]:
-    seen = set()
-    out = []
+    # lowercased key -> first original spelling (dicts keep insertion order)
+    seen: Dict[str, str] = {}
     for x in items:
-        k = x.lower()
-        if k not in seen:
-            seen.add(k)
-            out.append(x)
-    return out
+        seen.setdefault(x.lower(), x)
+    return list(seen.values())
+
+
+def _categorize(s: str) -> Optional[str]:
+    """
+    Highest-precedence category found in s (one regex pass), or None.
+    """
+    best = None
+    for m in DEONTIC_PAT.finditer(s):
+        kind = m.lastgroup
+        if kind == "prohibition":
+            return kind
+        if best is None or _PRECEDENCE[kind] < _PRECEDENCE[best]:
+            best = kind
+    return best
 
 
 def extract_deontic_statements(text: str, max_each: int = 12) -> Dict[str, Any]:
@@ -50,24 +68,22 @@ def extract_deontic_statements(text: str, max_each: int = 12) -> Dict[str, Any]:
     Returns JSON-safe dict with lists + counts.
     """
     t = text or ""
-    candidates = SENT_SPLIT.split(t)
 
     obligations: List[str] = []
     rights: List[str] = []
     prohibitions: List[str] = []
+    by_kind = {"prohibition": prohibitions, "obligation": obligations, "right": rights}
 
-    for cand in candidates:
-        s = _clean(cand)
+    # Sentences without any modal are skipped without being sliced or cleaned
+    for start, end in iter_hit_sentences(t, _DEONTIC_SCAN):
+        s = _clean(t[start:end])
         if not s or len(s) < 15:
             continue
 
         # categorize with precedence
-        if PROHIBITION_PAT.search(s):
-            prohibitions.append(s)
-        elif OBLIGATION_PAT.search(s):
-            obligations.append(s)
-        elif RIGHT_PAT.search(s):
-            rights.append(s)
+        kind = _categorize(s)
+        if kind:
+            by_kind[kind].append(s)
 
         if len(obligations) >= max_each and len(rights) >= max_each and len(prohibitions) >= max_each:
             break
@@ -1,59 +1,70 @@
 from __future__ import annotations
 
+import copy
 import re
 from typing import Dict, Any, List
 
 import spacy
 
+from src.cache import LRUCache, text_key
+
 # Lazy-loaded spaCy pipeline
 _NLP = None
 
+# Only doc.ents is read; NER in en_core_web_sm doesn't depend on these
+_UNUSED_PIPES = ("tagger", "parser", "attribute_ruler", "lemmatizer")
+
 
 def _get_nlp():
     global _NLP
     if _NLP is None:
         try:
-            _NLP = spacy.load("en_core_web_sm")
+            nlp = spacy.load("en_core_web_sm")
         except Exception as e:
             raise RuntimeError(
                 "spaCy model 'en_core_web_sm' not found. Run: python -m spacy download en_core_web_sm"
             ) from e
+        nlp.select_pipes(disable=[p for p in _UNUSED_PIPES if p in nlp.pipe_names])
+        _NLP = nlp
     return _NLP
 
 
 MONEY_PATTERNS = [
-    re.compile(r"(₹\s?[\d,]+(?:\.\d+)?)", re.I),
+    re.compile(r"₹\s?[\d,]+(?:\.\d+)?", re.I),
     re.compile(r"\bINR\s?[\d,]+(?:\.\d+)?\b", re.I),
     re.compile(r"\bRs\.?\s?[\d,]+(?:\.\d+)?\b", re.I),
 ]
 
 DATE_PATTERNS = [
-    re.compile(r"\b(\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\s+\d{4})\b", re.I),
-    re.compile(r"\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b"),
-    re.compile(r"\b((Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\s+\d{1,2},\s+\d{4})\b", re.I),
+    re.compile(r"\b\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\s+\d{4}\b", re.I),
+    re.compile(r"\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b"),
+    re.compile(r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\s+\d{1,2},\s+\d{4}\b", re.I),
 ]
 
+# Place names are capped at a few words on one line, so a match can't run
+# on through the rest of a paragraph
 JURISDICTION_PATTERNS = [
-    re.compile(r"\b(governing law)\b", re.I),
-    re.compile(r"\b(governed by the laws of\s+([A-Za-z\s]+))\b", re.I),
-    re.compile(r"\b(exclusive jurisdiction)\b", re.I),
-    re.compile(r"\b(courts?\s+of\s+([A-Za-z\s]+))\b", re.I),
-    re.compile(r"\b(jurisdiction)\b", re.I),
+    re.compile(r"\bgoverning law\b", re.I),
+    re.compile(r"\bgoverned by the laws of\s+[A-Za-z]+(?: [A-Za-z]+){0,7}\b", re.I),
+    re.compile(r"\bexclusive jurisdiction\b", re.I),
+    re.compile(r"\bcourts?\s+of\s+[A-Za-z]+(?: [A-Za-z]+){0,4}\b", re.I),
+    re.compile(r"\bjurisdiction\b", re.I),
 ]
 
+# ABC Pvt Ltd ("Client"): group 1 = name, group 2 = role (both are read)
+ROLE_PATTERN = re.compile(
+    r"([A-Z][A-Za-z0-9&.,\-\s]{2,120})\s*\(\s*\"?(Client|Vendor|Employer|Employee|Lessor|Lessee|Landlord|Tenant)\"?\s*\)",
+    re.I,
+)
+
 
 def _dedupe(items: List[str]) -> List[str]:
-    seen = set()
-    out = []
-    for x in items:
-        x = (x or "").strip()
-        if not x:
-            continue
-        k = x.lower()
-        if k not in seen:
-            seen.add(k)
-            out.append(x)
-    return out
+    # lowercased key -> first original spelling (dicts keep insertion order)
+    seen: Dict[str, str] = {}
+    for x in map(str.strip, filter(None, items)):
+        if x:
+            seen.setdefault(x.lower(), x)
+    return list(seen.values())
 
 
 def extract_parties(text: str) -> Dict[str, Any]:
@@ -64,12 +75,7 @@ def extract_parties(text: str) -> Dict[str, Any]:
     t = text or ""
     roles: Dict[str, str] = {}
 
-    role_pat = re.compile(
-        r"([A-Z][A-Za-z0-9&.,\-\s]{2,120})\s*\(\s*\"?(Client|Vendor|Employer|Employee|Lessor|Lessee|Landlord|Tenant)\"?\s*\)",
-        re.I,
-    )
-
-    for m in role_pat.finditer(t):
+    for m in ROLE_PATTERN.finditer(t):
         name = m.group(1).strip()
         role = m.group(2).strip().lower()
         roles[role] = name
@@ -82,17 +88,22 @@ def extract_parties(text: str) -> Dict[str, Any]:
     return {"roles": roles, "party_mentions": _dedupe(mentions)}
 
 
-def extract_entities(text: str) -> Dict[str, Any]:
+# Whole results keyed by text hash (the same clause is often re-analysed)
+_ENTITY_CACHE = LRUCache(maxsize=1024)
+
+# Every entity type read below needs a capital, a digit or a currency sign
+# (lowercase-only spellings like "thirty days" are the accepted miss); text
+# without any of them skips NER and gets the regex-only result
+_ENTITY_HINT = re.compile(r"[A-Z0-9₹]")
+
+
+def _extract_from_doc(doc, text: str) -> Dict[str, Any]:
     """
-    spaCy + regex hybrid NER over normalized English text.
-    Output is JSON-safe.
+    doc is None when NER was skipped for the text.
     """
-    nlp = _get_nlp()
-    doc = nlp(text or "")
-
     orgs, persons, locs, dates, money = [], [], [], [], []
 
-    for ent in doc.ents:
+    for ent in (doc.ents if doc is not None else ()):
         if ent.label_ == "ORG":
             orgs.append(ent.text)
         elif ent.label_ == "PERSON":
@@ -104,21 +115,13 @@ def extract_entities(text: str) -> Dict[str, Any]:
         elif ent.label_ == "MONEY":
             money.append(ent.text)
 
-    # Regex extraction (catches INR/₹ formats not always tagged)
+    # Regex extraction (catches INR/₹ formats not always tagged).
+    # The patterns have no capturing groups, so findall returns whole matches.
     for pat in MONEY_PATTERNS:
-        for m in pat.findall(text or ""):
-            if isinstance(m, tuple):
-                money.append(m[0])
-            else:
-                money.append(m)
+        money.extend(pat.findall(text or ""))
 
     for pat in DATE_PATTERNS:
-        hits = pat.findall(text or "")
-        for h in hits:
-            if isinstance(h, tuple):
-                dates.append(h[0])
-            else:
-                dates.append(h)
+        dates.extend(pat.findall(text or ""))
 
     juris = []
     for pat in JURISDICTION_PATTERNS:
@@ -136,3 +139,18 @@ def extract_entities(text: str) -> Dict[str, Any]:
         "money_amounts": _dedupe(money),
         "jurisdiction_mentions": _dedupe(juris),
     }
+
+
+def extract_entities(text: str) -> Dict[str, Any]:
+    """
+    spaCy + regex hybrid NER over normalized English text.
+    Output is JSON-safe.
+    """
+    text = text or ""
+    key = text_key(text)
+    result = _ENTITY_CACHE.get(key)
+    if result is None:
+        doc = _get_nlp()(text) if _ENTITY_HINT.search(text) else None
+        result = _extract_from_doc(doc, text)
+        _ENTITY_CACHE.put(key, result)
+    return copy.deepcopy(result)
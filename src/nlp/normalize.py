@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
-import requests
+from typing import Dict
 
-from src.config import OLLAMA_BASE_URL, OLLAMA_MODEL
+from src.config import OLLAMA_MODEL
+from src.llm.http import stream_chat
+from src.llm.json_utils import strip_code_fences
 
 
 @dataclass
 class NormalizationResult:
+    __slots__ = ("original_language", "normalized_language", "did_normalize", "normalized_text")
+
     original_language: str   # "en" | "hi" | "unknown"
     normalized_language: str # always "en"
     did_normalize: bool
@@ -32,37 +35,35 @@ def _cleanup_translation(text: str) -> str:
     """
     Removes accidental formatting like markdown code fences.
     """
-    t = (text or "").strip()
-
-    # Remove starting ``` or ```json fences if present
-    t = re.sub(r"^\s*```json\s*", "", t, flags=re.IGNORECASE)
-    t = re.sub(r"^\s*```\s*", "", t)
-
-    # Remove ending fence
-    t = re.sub(r"\s*```\s*$", "", t)
+    return strip_code_fences(text)
 
-    return t.strip()
 
-
-def translate_hi_to_en(hindi_text: str) -> str:
-    """
-    Uses local Ollama model to translate Hindi -> English.
-    """
-    payload = {
+def _translation_payload(hindi_text: str) -> Dict[str, object]:
+    return {
         "model": OLLAMA_MODEL,
         "messages": [
             {"role": "system", "content": _TRANSLATION_SYSTEM_PROMPT},
             {"role": "user", "content": hindi_text},
         ],
-        "stream": False,
+        "stream": True,
         "options": {"temperature": 0.0},
     }
 
-    r = requests.post(f"{OLLAMA_BASE_URL}/api/chat", json=payload, timeout=180)
-    r.raise_for_status()
 
-    raw = r.json()["message"]["content"]
-    return _cleanup_translation(raw)
+def translate_hi_to_en(hindi_text: str) -> str:
+    """
+    Uses local Ollama model to translate Hindi -> English.
+    """
+    return _cleanup_translation(_stream_text(_translation_payload(hindi_text)))
+
+
+def _stream_text(payload: Dict[str, object]) -> str:
+    """
+    Whole reply of a streamed /api/chat call. Streaming makes the timeout
+    apply between tokens rather than to the full translation, so a long
+    contract isn't cut off while the model is still producing it.
+    """
+    return "".join(stream_chat(payload, timeout=180))
 
 
 def normalize_contract_text(text: str, detected_lang: str) -> NormalizationResult:
@@ -88,3 +89,4 @@ def normalize_contract_text(text: str, detected_lang: str) -> NormalizationResul
         did_normalize=False,
         normalized_text=text,
     )
+
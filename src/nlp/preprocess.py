@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import Iterator, List, Dict, Any
 
-from langdetect import detect, LangDetectException
+from langdetect import DetectorFactory, LangDetectException
+from langdetect.detector_factory import PROFILES_DIRECTORY
+
+try:
+    from lingua import IsoCode639_1, LanguageDetectorBuilder
+except ImportError:  # optional: falls back to langdetect
+    LanguageDetectorBuilder = None
 
 from src.nlp.normalize import normalize_contract_text
 from src.nlp.contract_type import classify_contract_type
@@ -15,12 +24,20 @@ from src.nlp.ambiguity import detect_ambiguity
 
 @dataclass
 class Clause:
+    __slots__ = ("clause_id", "text")
+
     clause_id: str
     text: str
 
 
 @dataclass
 class PreprocessResult:
+    __slots__ = (
+        "language", "normalized_language", "did_normalize", "normalized_text", "clauses",
+        "contract_type", "contract_type_confidence", "contract_type_method", "contract_type_evidence",
+        "entities", "deontic", "ambiguity",
+    )
+
     # Language normalization
     language: str
     normalized_language: str
@@ -46,9 +63,76 @@ class PreprocessResult:
 
 
 
+# Only en/hi are told apart; the others stay so text in another language
+# still comes out as "unknown" instead of the closer of en/hi. That includes
+# the other Devanagari languages (Marathi, Nepali): without their profiles
+# they would score as Hindi and be sent for translation. Loading 17 of the
+# 55 bundled profiles cuts langdetect's memory and per-call scoring work;
+# lingua is limited to the same languages.
+_LANGDETECT_PROFILES = (
+    "en", "hi", "mr", "ne", "es", "fr", "de", "zh-cn", "ja", "ar", "ru", "pt", "it", "id", "bn", "ko", "tr",
+)
+
+# Lazy-loaded detectors: lingua's when installed, else the langdetect factory
+_LINGUA_DETECTOR = None
+_LANG_FACTORY = None
+
+
+def _get_lingua_detector():
+    global _LINGUA_DETECTOR
+    if _LINGUA_DETECTOR is None:
+        # lingua has no model for some of them (e.g. Nepali); those are skipped
+        codes = [
+            getattr(IsoCode639_1, lang[:2].upper())
+            for lang in _LANGDETECT_PROFILES
+            if hasattr(IsoCode639_1, lang[:2].upper())
+        ]
+        # Whole documents are detected, so trigram-only (low accuracy) mode
+        # loses nothing and loads far smaller models. Models are not preloaded:
+        # lingua loads one the first time a text could be in that language.
+        _LINGUA_DETECTOR = (
+            LanguageDetectorBuilder.from_iso_codes_639_1(*codes)
+            .with_low_accuracy_mode()
+            .build()
+        )
+    return _LINGUA_DETECTOR
+
+
+def _get_lang_factory() -> DetectorFactory:
+    global _LANG_FACTORY
+    if _LANG_FACTORY is None:
+        profiles = []
+        for lang in _LANGDETECT_PROFILES:
+            with open(os.path.join(PROFILES_DIRECTORY, lang), encoding="utf-8") as f:
+                profiles.append(f.read())
+        factory = DetectorFactory()
+        factory.load_json_profile(profiles)
+        _LANG_FACTORY = factory
+    return _LANG_FACTORY
+
+
+# Re-analysing the same text skips detection (langdetect is also unseeded,
+# so it could even answer differently the second time)
+@lru_cache(maxsize=64)
 def detect_language(text: str) -> str:
+    if LanguageDetectorBuilder is not None:
+        # Compiled (Rust) n-gram models: several times faster than langdetect
+        language = _get_lingua_detector().detect_language_of(text or "")
+        lang = language.iso_code_639_1.name.lower() if language is not None else ""
+        if lang == "hi":
+            # lingua has no Nepali model, so Nepali can come out as Hindi;
+            # confirm with langdetect before the text is sent for translation
+            return _detect_with_langdetect(text)
+        return lang if lang in {"en", "hi"} else "unknown"
+
+    return _detect_with_langdetect(text)
+
+
+def _detect_with_langdetect(text: str) -> str:
     try:
-        lang = detect(text)
+        detector = _get_lang_factory().create()
+        detector.append(text)
+        lang = detector.detect()
         if lang in {"en", "hi"}:
             return lang
         return "unknown"
@@ -56,10 +140,16 @@ def detect_language(text: str) -> str:
         return "unknown"
 
 
+_SPACE_RUN_RE = re.compile(r"[ \t]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+# Re-analysing the same text skips the regex passes
+@lru_cache(maxsize=64)
 def normalize_text(text: str) -> str:
     text = (text or "").replace("\r\n", "\n").replace("\r", "\n")
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _SPACE_RUN_RE.sub(" ", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text)
     return text.strip()
 
 
@@ -71,54 +161,94 @@ _CLAUSE_SPLIT_PATTERNS = [
 ]
 
 
-def extract_clauses(text: str) -> List[Clause]:
-    norm = normalize_text(text)
+# All split patterns in one pass. Each alternative is a lookahead at a line
+# start, so a long match (e.g. "1." plus the blank lines after it) can't hide
+# another heading that starts on a following line.
+_CLAUSE_SPLIT_RE = re.compile(
+    r"(?m)^(?=" + "|".join(f"(?:{p[len('(?m)^'):]})" for p in _CLAUSE_SPLIT_PATTERNS) + ")"
+)
 
-    starts = []
-    for pat in _CLAUSE_SPLIT_PATTERNS:
-        for m in re.finditer(pat, norm):
-            starts.append(m.start())
 
-    starts = sorted(set(starts))
+_CLAUSE_SPLIT_COMPILED = [re.compile(p) for p in _CLAUSE_SPLIT_PATTERNS]
 
-    if not starts:
-        paras = [p.strip() for p in norm.split("\n\n") if p.strip()]
-        return [Clause(clause_id=f"C{i:03d}", text=p) for i, p in enumerate(paras, start=1)]
 
-    segments = []
-    for i, s in enumerate(starts):
-        e = starts[i + 1] if i + 1 < len(starts) else len(norm)
+def _clause_starts(norm: str) -> List[int]:
+    """
+    Same starts as running each split pattern's finditer on its own. The
+    fused pass only proposes candidates; a pattern then skips candidates its
+    own previous match ran over (e.g. "1." whose trailing \\s+ swallowed the
+    newline and indent before " 2. ..."), as finditer would have.
+    """
+    ends = [0] * len(_CLAUSE_SPLIT_COMPILED)
+    starts = []
+    for m in _CLAUSE_SPLIT_RE.finditer(norm):
+        s = m.start()
+        found = False
+        for k, pat in enumerate(_CLAUSE_SPLIT_COMPILED):
+            if s < ends[k]:
+                continue
+            mk = pat.match(norm, s)
+            if mk:
+                ends[k] = mk.end()
+                found = True
+        if found:
+            starts.append(s)
+    return starts
+
+
+def _iter_segments(norm: str, starts: List[int]) -> Iterator[str]:
+    """
+    Non-empty stripped text between consecutive clause starts.
+    """
+    for s, e in zip(starts, starts[1:] + [len(norm)]):
         chunk = norm[s:e].strip()
         if chunk:
-            segments.append(chunk)
+            yield chunk
+
 
-    return [Clause(clause_id=f"C{i:03d}", text=seg) for i, seg in enumerate(segments, start=1)]
+def extract_clauses(text: str) -> List[Clause]:
+    return _split_clauses(normalize_text(text))
 
 
-def preprocess_contract(text: str) -> PreprocessResult:
-    lang = detect_language(text)
+def _split_clauses(norm: str) -> List[Clause]:
+    """
+    extract_clauses for text normalize_text has already been applied to.
+    """
+    starts = _clause_starts(norm)
 
-    # Hindi → English normalization
-    norm_result = normalize_contract_text(text, lang)
-    norm_text = normalize_text(norm_result.normalized_text)
+    if not starts:
+        paras = [p.strip() for p in norm.split("\n\n") if p.strip()]
+        return [Clause(clause_id=f"C{i:03d}", text=p) for i, p in enumerate(paras, start=1)]
 
-    # Contract type classification on normalized English
-    ct = classify_contract_type(norm_text, llm_fallback_threshold=0.55)
+    return [Clause(clause_id=f"C{i:03d}", text=seg) for i, seg in enumerate(_iter_segments(norm, starts), start=1)]
 
 
+def preprocess_contract(text: str) -> PreprocessResult:
+    # Normalized once up front; only a translation needs a second pass
+    norm_input = normalize_text(text)
+    lang = detect_language(norm_input)
 
+    # Hindi → English normalization
+    norm_result = normalize_contract_text(norm_input, lang)
+    norm_text = normalize_text(norm_result.normalized_text) if norm_result.did_normalize else norm_input
 
-    # Named entity extraction
-    entities = extract_entities(norm_text)
+    # Contract type classification (may wait on the LLM fallback) and spaCy
+    # NER run in workers; the pure-regex passes below hold the GIL anyway,
+    # so they stay on this thread and overlap with them
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_ct = ex.submit(classify_contract_type, norm_text, llm_fallback_threshold=0.55)
+        f_entities = ex.submit(extract_entities, norm_text)
 
-    ambiguity = detect_ambiguity(norm_text)
+        ambiguity = detect_ambiguity(norm_text)
 
+        # Obligation / right / prohibition extraction
+        deontic = extract_deontic_statements(norm_text)
 
-    # Obligation / right / prohibition extraction
-    deontic = extract_deontic_statements(norm_text)
+        # Clause extraction
+        clauses = _split_clauses(norm_text)
 
-    # Clause extraction
-    clauses = extract_clauses(norm_text)
+        ct = f_ct.result()
+        entities = f_entities.result()
 
     return PreprocessResult(
         language=lang,
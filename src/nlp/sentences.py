@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import re
+from typing import AbstractSet, Iterator, List, Sequence, Tuple
+
+try:
+    import re2
+except ImportError:  # optional: whole-text scans fall back to stdlib re
+    re2 = None
+
+# Split into candidates (simple + robust)
+SENT_SPLIT = re.compile(r"(?<=[\.\n;:])\s+")
+
+_DELIMS = ".\n;:"
+
+# Python's \s for str, spelled out for RE2 (whose \s is ASCII-only)
+_RE2_SPACE = r"[\t\n\x0b\f\r\x1c-\x1f\x85\p{Z}]"
+
+# RE2's \w, \d and \b are ASCII-only, so non-ASCII word characters are
+# swapped for ASCII ones of the same class before an RE2 scan. The four
+# letters re.I equates with ASCII ones become those letters.
+_NON_ASCII_WORD = re.compile(r"(?![\x00-\x7f])\w")
+_RE2_FOLD = {"İ": "i", "ı": "i", "ſ": "s", "K": "k"}
+
+
+def _ascii_stand_in(m: re.Match) -> str:
+    c = m.group()
+    return _RE2_FOLD.get(c) or ("0" if c.isdecimal() else "x")
+
+
+def scan_text(text: str) -> str:
+    """
+    text as scan_pattern / PatternSet scans should see it, with the same
+    offsets. For ASCII text (the usual case) that is text itself.
+    """
+    if re2 is None or text.isascii():
+        return text
+    return _NON_ASCII_WORD.sub(_ascii_stand_in, text)
+
+
+def scan_pattern(pattern: re.Pattern):
+    """
+    RE2 (linear-time, no backtracking) copy of pattern for whole-text
+    finditer scans such as iter_hit_sentences, or pattern itself without
+    google-re2 or if RE2 rejects it. Run it over scan_text(text): for an
+    ASCII-only pattern the hits are then exact on ASCII text and a superset
+    elsewhere, so hits in non-ASCII text need confirming with pattern.
+    \s must not appear inside a character class.
+    Only use it for finditer over whole texts: google-re2 re-encodes the
+    string on every call, so per-sentence search() is slower than stdlib re.
+    """
+    if re2 is None:
+        return pattern
+    src = pattern.pattern.replace(r"\s", _RE2_SPACE)
+    try:
+        return re2.compile(("(?i)" if pattern.flags & re.I else "") + src)
+    except re2.error:
+        return pattern
+
+
+class PatternSet:
+    """
+    Answers "which of these patterns match text anywhere" in one pass: an RE2
+    set matches all of them together (linear time, no per-pattern scans).
+    RE2 hits are exact for ASCII text; for other text they are a superset
+    (see scan_pattern) and are confirmed with the stdlib patterns. Without
+    google-re2, or if RE2 rejects a pattern, every pattern is searched in turn.
+    """
+
+    def __init__(self, patterns: Sequence[re.Pattern]):
+        self.patterns = list(patterns)
+        self._set = None
+        if re2 is None:
+            return
+        rset = re2.Set.SearchSet()
+        try:
+            for pattern in self.patterns:
+                src = pattern.pattern.replace(r"\s", _RE2_SPACE)
+                rset.Add(("(?i)" if pattern.flags & re.I else "") + src)
+            rset.Compile()
+        except re2.error:
+            return
+        self._set = rset
+
+    def matches(self, text: str, skip: AbstractSet[int] = frozenset()) -> List[int]:
+        """
+        Indexes of the patterns that search() would find in text, ascending.
+        Indexes in skip (already known hits) are never searched or returned.
+        """
+        if self._set is None:
+            return [i for i, pattern in enumerate(self.patterns) if i not in skip and pattern.search(text)]
+        hits = sorted(i for i in self._set.Match(scan_text(text)) or () if i not in skip)
+        if text.isascii():
+            return hits
+        return [i for i in hits if self.patterns[i].search(text)]
+
+
+def _sentence_start(text: str, pos: int, lo: int = 0) -> int:
+    """
+    Start of the SENT_SPLIT sentence containing text[pos] (a non-space char),
+    found by scanning back for the last delimiter that begins a separator.
+    lo must be a known sentence start at or before pos.
+    """
+    k = pos
+    while k > lo:
+        d = max(text.rfind(c, lo, k) for c in _DELIMS)
+        if d < 0:
+            break
+        sep = SENT_SPLIT.match(text, d + 1)
+        if sep:
+            return sep.end()
+        k = d
+    return lo
+
+
+def iter_hit_sentences(text: str, pattern: re.Pattern) -> Iterator[Tuple[int, int]]:
+    """
+    (start, end) of every sentence, as SENT_SPLIT.split(text) would produce
+    them, in which pattern matches, in order. Runs pattern over the raw text
+    and only locates boundaries around hits, so no sentence list is built.
+    pattern must only match starting at a non-space character; a match that
+    straddles a boundary reports the sentence it starts in.
+    """
+    scan = scan_text(text)
+    pos = 0
+    while True:
+        for m in pattern.finditer(scan, pos):
+            if m.start() >= pos:
+                start = _sentence_start(text, m.start(), pos)
+                sep = SENT_SPLIT.search(text, m.start())
+                yield start, (sep.start() if sep else len(text))
+                if not sep:
+                    return
+                # One hit is enough for this sentence; skip to the next one
+                pos = sep.end()
+            if m.end() > pos:
+                # The match ran into the next sentence and may have hidden a
+                # hit there: rescan from its start
+                break
+        else:
+            return
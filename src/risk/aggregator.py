@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+from bisect import bisect_right
+from collections import Counter
 from dataclasses import dataclass
 from typing import Dict, List, Any, Tuple
 
-from src.risk.patterns import detect_red_flags, RedFlag
+from src.risk.patterns import detect_red_flags_in, RedFlag
 
 
 @dataclass
 class ClauseAnalysis:
+    __slots__ = ("clause_id", "clause_text", "clause_type", "risk_level", "risk_reason")
+
     clause_id: str
     clause_text: str
     clause_type: str
@@ -15,22 +19,18 @@ class ClauseAnalysis:
     risk_reason: str
 
 
-def _risk_to_score(risk: str) -> int:
-    if risk == "High":
-        return 3
-    if risk == "Medium":
-        return 2
-    if risk == "Low":
-        return 1
-    return 1  # Unclear treated as low-ish but we track it
+# Any other level (Unclear) scores 1: treated as low-ish but we track it
+_RISK_SCORE: Dict[str, int] = {"High": 3, "Medium": 2, "Low": 1}
+
+
+# avg >= 2.3 is High, >= 1.7 Medium, else Low
+_OVERALL_THRESHOLDS = (1.7, 2.3)
+_OVERALL_LEVELS = ("Low", "Medium", "High")
 
 
 def _score_to_overall(avg_score: float) -> str:
-    if avg_score >= 2.3:
-        return "High"
-    if avg_score >= 1.7:
-        return "Medium"
-    return "Low"
+    # bisect_right: a score equal to a threshold belongs to the level above
+    return _OVERALL_LEVELS[bisect_right(_OVERALL_THRESHOLDS, avg_score)]
 
 
 def aggregate_contract(clauses: List[ClauseAnalysis]) -> Dict[str, Any]:
@@ -48,12 +48,10 @@ def aggregate_contract(clauses: List[ClauseAnalysis]) -> Dict[str, Any]:
             "red_flags": [],
         }
 
-    counts = {"High": 0, "Medium": 0, "Low": 0, "Unclear": 0}
-    total = 0
-
-    for c in clauses:
-        counts[c.risk_level] = counts.get(c.risk_level, 0) + 1
-        total += _risk_to_score(c.risk_level)
+    levels = [c.risk_level for c in clauses]
+    counts = Counter({"High": 0, "Medium": 0, "Low": 0, "Unclear": 0})
+    counts.update(levels)
+    total = sum(_RISK_SCORE.get(level, 1) for level in levels)
 
     avg = total / max(len(clauses), 1)
     overall = _score_to_overall(avg)
@@ -63,8 +61,7 @@ def aggregate_contract(clauses: List[ClauseAnalysis]) -> Dict[str, Any]:
     high_risk_sorted = high_risk[:8]  # cap for UI
 
     # Rule-based red flags across all text
-    full_text = "\n".join([c.clause_text for c in clauses])
-    flags = detect_red_flags(full_text)
+    flags = detect_red_flags_in(c.clause_text for c in clauses)
 
     # Convert flags to dicts for UI
     flags_out = [{"flag_type": f.flag_type, "severity": f.severity, "reason": f.reason} for f in flags]
@@ -72,7 +69,7 @@ def aggregate_contract(clauses: List[ClauseAnalysis]) -> Dict[str, Any]:
     return {
         "overall_risk": overall,
         "avg_score": round(avg, 2),
-        "counts": counts,
+        "counts": dict(counts),
         "top_high_risk": [
             {
                 "clause_id": c.clause_id,
@@ -2,11 +2,15 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from typing import Iterable, List, Dict, Tuple
+
+from src.nlp.sentences import PatternSet
 
 
 @dataclass
 class RedFlag:
+    __slots__ = ("flag_type", "severity", "reason")
+
     flag_type: str
     severity: str  # "Low" | "Medium" | "High"
     reason: str
@@ -38,13 +42,36 @@ PATTERNS: List[Tuple[str, str, re.Pattern, str]] = [
 ]
 
 
+# Every pattern checked in one pass over the text
+_PATTERN_SET = PatternSet(pattern for _, _, pattern, _ in PATTERNS)
+
+
 def detect_red_flags(text: str) -> List[RedFlag]:
     """
     Rule-based detection of red flags.
     Works for English text (Hindi handled later by normalization phase).
     """
+    return _flags_for(_PATTERN_SET.matches(text or ""))
+
+
+def detect_red_flags_in(texts: Iterable[str]) -> List[RedFlag]:
+    """
+    detect_red_flags("\n".join(texts)) without building the joined text: no
+    pattern matches across a newline, so each text is checked on its own,
+    stopping once every flag has been seen. Flags already found are not
+    searched for again in later texts.
+    """
+    found = set()
+    for text in texts:
+        found.update(_PATTERN_SET.matches(text or "", skip=found))
+        if len(found) == len(PATTERNS):
+            break
+    return _flags_for(sorted(found))
+
+
+def _flags_for(indexes: Iterable[int]) -> List[RedFlag]:
     flags: List[RedFlag] = []
-    for flag_type, severity, pattern, reason in PATTERNS:
-        if pattern.search(text or ""):
-            flags.append(RedFlag(flag_type=flag_type, severity=severity, reason=reason))
+    for i in indexes:
+        flag_type, severity, _, reason = PATTERNS[i]
+        flags.append(RedFlag(flag_type=flag_type, severity=severity, reason=reason))
     return flags
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple
+import heapq
 import re
 
+import numpy as np
+
+from src.nlp.sentences import PatternSet
+
 # High-signal patterns for selecting clauses for LLM semantic analysis
 SELECT_PATTERNS: List[Tuple[str, int, re.Pattern]] = [
     ("Indemnity", 5, re.compile(r"\bindemnif(y|ies|ication)\b|\bhold harmless\b", re.I)),
@@ -23,14 +29,32 @@ SELECT_PATTERNS: List[Tuple[str, int, re.Pattern]] = [
 ]
 
 
+_LABELS: List[str] = [label for label, _, _ in SELECT_PATTERNS]
+_WEIGHTS = np.array([weight for _, weight, _ in SELECT_PATTERNS], dtype=np.int64)
+
+# Every pattern checked in one pass over the clause
+_SELECT_SET = PatternSet(pattern for _, _, pattern in SELECT_PATTERNS)
+
+
 @dataclass
 class SelectedClause:
+    __slots__ = ("clause_id", "text", "score", "reasons")
+
     clause_id: str
     text: str
     score: int
     reasons: List[str]
 
 
+# Boilerplate clauses and re-analysed contracts repeat the same texts
+@lru_cache(maxsize=2048)
+def _select_hits(text: str) -> Tuple[int, ...]:
+    """
+    Indexes into SELECT_PATTERNS of the patterns matching text.
+    """
+    return tuple(_SELECT_SET.matches(text))
+
+
 def score_clause(text: str) -> Tuple[int, List[str]]:
     """
     Returns (score, reasons) for clause selection.
@@ -40,14 +64,26 @@ def score_clause(text: str) -> Tuple[int, List[str]]:
     reasons: List[str] = []
     t = text or ""
 
-    for label, weight, pattern in SELECT_PATTERNS:
-        if pattern.search(t):
-            score += weight
-            reasons.append(label)
+    for k in _select_hits(t):
+        label, weight, _ = SELECT_PATTERNS[k]
+        score += weight
+        reasons.append(label)
 
     return score, reasons
 
 
+def score_clauses(texts: List[str]) -> np.ndarray:
+    """
+    Batch form of score_clause.
+    Returns an (N, K) 0/1 hit matrix: [i, k] is 1 when SELECT_PATTERNS[k]
+    matches texts[i]. Scores are `hits @ _WEIGHTS`.
+    """
+    hits = np.zeros((len(texts), len(SELECT_PATTERNS)), dtype=np.int8)
+    for i, t in enumerate(texts):
+        hits[i, list(_select_hits(t))] = 1
+    return hits
+
+
 def smart_select_clauses(
     clauses_list: List[Dict[str, Any]],
     max_llm_clauses: int = 12,
@@ -63,27 +99,33 @@ def smart_select_clauses(
       [{"clause_id": "...", "text": "..."}, ...]
     """
 
-    scored: List[SelectedClause] = []
-    for c in clauses_list:
-        s, reasons = score_clause(c.get("text", ""))
-        scored.append(
-            SelectedClause(
-                clause_id=c.get("clause_id", ""),
-                text=c.get("text", ""),
-                score=s,
-                reasons=reasons,
-            )
+    texts = [c.get("text", "") or "" for c in clauses_list]
+    hits = score_clauses(texts)
+    scores = hits @ _WEIGHTS
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+
+    scored: List[SelectedClause] = [
+        SelectedClause(
+            clause_id=c.get("clause_id", ""),
+            text=texts[i],
+            score=int(scores[i]),
+            reasons=[_LABELS[k] for k in np.flatnonzero(hits[i])],
         )
+        for i, c in enumerate(clauses_list)
+    ]
 
     # Baseline clauses (first N) always included
     baseline = scored[: max(0, ensure_baseline)]
 
-    # Rank all clauses by score desc, then length desc (tie-breaker)
-    ranked = sorted(
-        scored,
-        key=lambda x: (x.score, len(x.text)),
-        reverse=True,
-    )
+    # Rank by score desc, then length desc (tie-breaker); equal keys keep
+    # document order. Only the head of the ranking is ever read: at most
+    # max_llm_clauses picks, plus skipped baseline / id-less / repeated-id
+    # clauses. nlargest equals sorted(reverse=True)[:n] without sorting everything.
+    distinct_ids = len({c.clause_id for c in scored if c.clause_id})
+    n_ranked = max_llm_clauses + len(baseline) + len(scored) - distinct_ids
+    # Keys built once; the bound __getitem__ avoids a Python-level key call
+    rank_keys = list(zip(scores.tolist(), lengths.tolist()))
+    ranked = [scored[i] for i in heapq.nlargest(n_ranked, range(len(scored)), key=rank_keys.__getitem__)]
 
     selected: List[SelectedClause] = []
     seen_ids = set()